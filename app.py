@@ -1,218 +1,9 @@
 import streamlit as st
-from streamlit.components.v1 import html
 import time
 import os
-
-# Custom CSS with all original styles
-def inject_css():
-    st.markdown("""
-    <style>
-    /* Reset and base styles */
-    * {
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-        text-decoration: none;
-        list-style: none;
-    }
-
-    /* Font imports */
-    @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;700&family=Roboto:wght@300;400&display=swap');
-
-    /* Body styles */
-    body {
-        font-family: 'Roboto', sans-serif;
-        line-height: 1.6;
-        color: #333;
-        background-color: #f9f9f9;
-    }
-
-    /* Header styles */
-    header {
-        background-color: #333;
-        color: white;
-        padding: 20px;
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        position: sticky;
-        top: 0;
-        z-index: 1000;
-    }
-
-    .logo {
-        font-family: 'Playfair Display', serif;
-        font-size: 28px;
-        font-weight: 700;
-    }
-
-    nav ul {
-        display: flex;
-        gap: 15px;
-    }
-
-    nav ul li a {
-        color: white;
-        padding: 8px 16px;
-        transition: background-color 0.3s ease;
-    }
-
-    nav ul li a:hover {
-        background-color: #555;
-        border-radius: 4px;
-    }
-
-    /* Hero section */
-    .hero {
-        background-image: linear-gradient(rgba(0, 0, 0, 0.5), rgba(0, 0, 0, 0.5)), url('https://images.unsplash.com/photo-1483985988355-763728e1935b');
-        background-size: cover;
-        background-position: center;
-        height: 500px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        text-align: center;
-    }
-
-    .hero-content h1 {
-        font-family: 'Playfair Display', serif;
-        font-size: 48px;
-        margin-bottom: 20px;
-    }
-
-    .hero-content p {
-        font-size: 20px;
-        margin-bottom: 30px;
-    }
-
-    .cta-button {
-        background-color: #e91e63;
-        color: white;
-        padding: 10px 20px;
-        border-radius: 5px;
-        font-size: 18px;
-        transition: background-color 0.3s ease;
-        display: inline-block;
-        cursor: pointer;
-    }
-
-    .cta-button:hover {
-        background-color: #c2185b;
-    }
-
-    /* Features section */
-    .features {
-        display: flex;
-        justify-content: space-around;
-        padding: 60px 20px;
-        background-color: white;
-        flex-wrap: wrap;
-    }
-
-    .feature-box {
-        text-align: center;
-        max-width: 300px;
-        margin: 20px;
-    }
-                
-    .center-button-wrapper {
-    display: flex;
-    justify-content: center;
-    margin-top: 30px;
-    }
-
-
-    .feature-box h2 {
-        font-family: 'Playfair Display', serif;
-        font-size: 24px;
-        margin-bottom: 20px;
-        color: #000000;
-    }
-
-    .feature-box p {
-        font-size: 16px;
-        color: #000000;
-    }
-
-    /* Footer */
-    footer {
-        background-color: #333;
-        color: white;
-        text-align: center;
-        padding: 20px 0;
-        font-size: 14px;
-    }
-
-    /* Streamlit overrides */
-    .stApp {
-        padding: 0 !important;
-        margin: 0 !important;
-    }
-    
-    .stMarkdown {
-        padding: 0 !important;
-        margin: 0 !important;
-    }
-    
-    /* Chatbot specific styles */
-    iframe[title="Web chat"] {
-        display: block !important;
-        position: fixed !important;
-        right: 20px !important;
-        bottom: 20px !important;
-        width: 376px !important;
-        height: 646px !important;
-        border: none !important;
-        z-index: 1001 !important;
-    }
-    
-    /* Upload page styles */
-    .upload-container {
-        padding: 40px;
-        text-align: center;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# Watson Assistant implementation with container
-def watson_chat():
-    return """
-    <div id="watson-chat-container">
-    <script>
-      window.watsonAssistantChatOptions = {
-        integrationID: "f42d8c8b-7fbf-472b-8522-443e0956d529",
-        region: "au-syd",
-        serviceInstanceID: "092e368d-f783-43c6-9a54-68b689045e9b",
-        onLoad: function(instance) { 
-          instance.render({
-            target: document.getElementById('watson-chat-container'),
-            serviceInstanceID: '092e368d-f783-43c6-9a54-68b689045e9b'
-          }); 
-        }
-      };
-      setTimeout(function(){
-        const t = document.createElement('script');
-        t.src = "https://web-chat.global.assistant.watson.appdomain.cloud/versions/" + 
-               (window.watsonAssistantChatOptions.clientVersion || 'latest') + 
-               "/WatsonAssistantChatEntry.js";
-        document.head.appendChild(t);
-      }, 1000);
-    </script>
-    </div>
-    """
-
-def get_nav_links(current_page):
-    return f"""
-    <nav>
-        <ul>
-            <li><a href="app.py" {'style="font-weight:bold;"' if current_page == 'home' else ''}>Home</a></li>
-            <li><a href="collection.py" {'style="font-weight:bold;"' if current_page == 'collection' else ''}>Collections</a></li>
-            <li><a href="about.py" {'style="font-weight:bold;"' if current_page == 'about' else ''}>About Us</a></li>
-            <li><a href="contact.py" {'style="font-weight:bold;"' if current_page == 'contact' else ''}>Contact</a></li>
-        </ul>
-    </nav>
-    """
+from fashion.preload import start_background_preload
+from fashion.metrics import start_exporter
+from fashion.layout import inject_css, inject_chat, get_nav_links
 
 def home_page():
     # Header
@@ -316,7 +107,11 @@ def main():
     )
     
     # Inject CSS first
-    inject_css()
+    inject_css("home")
+    
+    # Start importing the analysis backend while the user is still on this page
+    start_background_preload()
+    start_exporter()
     
     # Get current script name to determine which page to show
     script_name = os.path.basename(__file__).lower()
@@ -336,7 +131,7 @@ def main():
         home_page()
     
     # Add Watson Chat with container
-    html(watson_chat(), height=600)
+    inject_chat()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+# Load, lookup and palette-render cost of the recommendation catalog as it grows.
+#   python benchmarks/bench_catalog.py [--sizes 64 1000 10000 50000]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.catalog import CATALOG_PATH, Catalog, palette_grid_html
+
+LOOKUPS = 100000
+
+
+def synthetic_catalog(base, size):
+    data = dict(base)
+    items = list(base["recommendations"])
+    i = 0
+    while len(items) < size:
+        item = dict(base["recommendations"][i % len(base["recommendations"])])
+        item["text"] = f"{item['text']} (variant {i})"
+        items.append(item)
+        i += 1
+    data["recommendations"] = items[:size]
+    return data
+
+def per_call_us(fn, n=LOOKUPS):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 1000, 10000, 50000])
+    args = parser.parse_args()
+    with open(CATALOG_PATH) as f:
+        base = json.load(f)
+
+    print(f"{'items':>7} {'file KB':>8} {'load ms':>8} {'recs us':>8} {'lookup us':>10} {'palette us':>11} {'rebuild palette us':>19}")
+    for size in args.sizes:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(synthetic_catalog(base, size), f)
+            path = f.name
+        start = time.perf_counter()
+        catalog = Catalog.from_file(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        kb = os.path.getsize(path) / 1024
+        os.remove(path)
+
+        recs = per_call_us(lambda: catalog.recommendations("Autumn", "pear"))
+        lookup = per_call_us(lambda: catalog.lookup("pear", "Autumn", "formal"))
+        palette = per_call_us(lambda: catalog.palette_html("Autumn"))
+        rebuild = per_call_us(lambda: palette_grid_html(catalog.palette("Autumn")), 10000)
+        print(f"{size:>7} {kb:>8.0f} {load_ms:>8.1f} {recs:>8.2f} {lookup:>10.2f} {palette:>11.2f} {rebuild:>19.2f}")
+
+if __name__ == "__main__":
+    main()
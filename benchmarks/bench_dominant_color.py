@@ -0,0 +1,62 @@
+# Compare the old Counter-based dominant colour with the NumPy engine.
+#   python benchmarks/bench_dominant_color.py [--sizes 0.3 2 12]
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.color import most_frequent_color
+
+
+def legacy_most_frequent_color(original_img, mask):
+    pixels = original_img[mask > 0].reshape(-1, 3)
+    pixel_counts = Counter(map(tuple, pixels))
+    most_common_color = pixel_counts.most_common(1)[0][0]
+    hex_color = "#{:02x}{:02x}{:02x}".format(*most_common_color[::-1])
+    return most_common_color, hex_color
+
+# Skin-like noise so the mask keeps a realistic share of the frame
+def synthetic_image(megapixels, seed=0):
+    rng = np.random.default_rng(seed)
+    h = int(np.sqrt(megapixels * 1e6 * 3 / 4))
+    w = int(h * 4 / 3)
+    base = np.array([120, 150, 200], dtype=np.int16)
+    img = base + rng.normal(0, 18, size=(h, w, 3))
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.3, 2.0, 12.0])
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'MP':>6} {'pixels':>10} {'legacy s':>9} {'exact s':>8} {'quant s':>8} {'kmeans s':>9} {'speedup':>8}  match")
+    for mp in args.sizes:
+        img = synthetic_image(mp)
+        ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
+        mask = cv2.inRange(ycrcb, np.array([0, 135, 85]), np.array([255, 180, 135]))
+        t_exact, exact = timed(most_frequent_color, img, mask)
+        t_quant, _ = timed(most_frequent_color, img, mask, mode="quantized")
+        t_kmeans, _ = timed(most_frequent_color, img, mask, mode="kmeans")
+        if args.skip_legacy:
+            legacy_s, speedup, match = "-", "-", "-"
+        else:
+            t_legacy, legacy = timed(legacy_most_frequent_color, img, mask)
+            legacy_s = f"{t_legacy:.3f}"
+            speedup = f"{t_legacy / t_exact:.1f}x"
+            match = str(legacy[1] == exact[1])
+        print(f"{mp:>6} {int(np.count_nonzero(mask)):>10} {legacy_s:>9} {t_exact:>8.3f} "
+              f"{t_quant:>8.3f} {t_kmeans:>9.3f} {speedup:>8}  {match}")
+
+if __name__ == "__main__":
+    main()
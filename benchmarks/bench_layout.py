@@ -0,0 +1,90 @@
+# Bytes sent to the browser and script time per rerun for the styled pages.
+#   python benchmarks/bench_layout.py [--reruns 20] [--out FILE] [--compare FILE]
+# Runs each page headlessly with Streamlit's AppTest, sums the serialized size
+# of every element it emits (what a rerun re-sends), split into CSS, chat embed
+# and the rest, and times reruns. --out saves the numbers; --compare prints the
+# change against an earlier --out (e.g. from before a layout change).
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ("app.py", os.path.join("pages", "upload.py"))
+
+def elements(node):
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            yield from elements(child)
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize") and not isinstance(children, dict):
+        yield node
+
+def payload(at):
+    sizes = {"css": 0, "chat": 0, "other": 0}
+    for node in elements(at._tree):
+        size = node.proto.ByteSize()
+        body = getattr(node.proto, "body", "") or ""
+        if "<style>" in body:
+            sizes["css"] += size
+        elif type(node).__name__ == "UnknownElement":  # components.html iframe (the chat embed)
+            sizes["chat"] += size
+        else:
+            sizes["other"] += size
+    sizes["total"] = sum(sizes.values())
+    return sizes
+
+def measure(page, reruns):
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=60)
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+    return {"first_run_ms": first * 1000, "rerun_p50_ms": float(np.percentile(times, 50)) * 1000,
+            "rerun_p90_ms": float(np.percentile(times, 90)) * 1000, "payload_bytes": payload(at)}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--out", help="save results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    os.environ.setdefault("FASHION_PRELOAD", "0")  # no background imports competing with the timed reruns
+    os.chdir(ROOT)  # pages use paths relative to the app root (img/)
+    results = {page: measure(page, args.reruns) for page in PAGES}
+    before = None
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+
+    print(f"{'page':<18} {'first ms':>9} {'rerun p50':>10} {'rerun p90':>10} {'CSS B':>7} {'chat B':>7} {'other B':>8} {'total B':>8}")
+    for page, r in results.items():
+        rows = [("", r)] if before is None or page not in before else [("before", before[page]), ("after", r)]
+        for label, row in rows:
+            b = row["payload_bytes"]
+            print(f"{(label or page):<18} {row['first_run_ms']:>9.1f} {row['rerun_p50_ms']:>10.1f} {row['rerun_p90_ms']:>10.1f} "
+                  f"{b['css']:>7} {b['chat']:>7} {b['other']:>8} {b['total']:>8}")
+        if len(rows) == 2:
+            print(f"{page:<18} payload {b['total'] - before[page]['payload_bytes']['total']:+d} B, "
+                  f"rerun p50 {r['rerun_p50_ms'] - before[page]['rerun_p50_ms']:+.1f} ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
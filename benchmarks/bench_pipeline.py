@@ -0,0 +1,239 @@
+# End-to-end benchmark of the analysis pipeline on synthetic photos of 0.3-24 MP.
+#   python benchmarks/bench_pipeline.py [--sizes 0.3,1,3,12,24] [--repeat 5] [--pose]
+#                                       [--out FILE] [--baseline FILE] [--save-baseline]
+# Reports p50/p90/p99 latency, peak RSS growth and peak traced allocations per stage
+# and size, writes them as JSON, and exits 1 if a stage got slower or hungrier than
+# the stored baseline by more than --tolerance. detect_keypoints (--pose) needs the
+# Detectron2 model; without it the body stages use a synthetic skeleton.
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from fashion.color import white_balance, enhance_image, normalize_lab, skin_mask, most_frequent_color
+from fashion.body import detect_keypoints, extract_measurements, classify_body_shape
+from fashion.backend import analyze_skin, analyze_body
+from fashion.ingest import ingest_upload
+from synthetic import synthetic_keypoints, synthetic_photo
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SIZES_MP = (0.3, 1, 3, 12, 24)
+# Differences below this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 2.0
+MIN_REGRESSION_BYTES = 1 << 20
+
+# pages/upload.py is a Streamlit script, not a module; load it in bare mode from a
+# scratch directory so its img/ folder (and every saved upload) lands there
+def load_upload_page(workdir):
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location("upload_page", os.path.join(ROOT, "pages", "upload.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    # Streamlit sets levels on its own loggers; quiet the "missing ScriptRunContext" noise
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    return module
+
+def current_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+# Highest RSS seen while a stage runs, sampled from a side thread
+class RssSampler:
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.start = self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+# Time `repeat` calls, then one more under the RSS sampler and tracemalloc (which
+# slows Python-level allocation, so it is kept out of the timed runs)
+def measure(fn, repeat):
+    fn()  # warm-up: first-call imports, lazy buffers, page cache
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    with RssSampler() as rss:
+        tracemalloc.start()
+        fn()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "p50_ms": percentile(times, 50),
+        "p90_ms": percentile(times, 90),
+        "p99_ms": percentile(times, 99),
+        "rss_peak_delta_bytes": rss.peak - rss.start,
+        "alloc_peak_bytes": traced_peak,
+    }
+
+def pipeline_stages(image, upload_page, predictor=None):
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 92])
+    data = encoded.tobytes()
+    keypoints = synthetic_keypoints(image.shape)
+    enhanced = enhance_image(white_balance(image))
+    mask = skin_mask(enhanced)
+    measurements = extract_measurements(keypoints)
+    ingested = ingest_upload(data)
+
+    # What the upload page does with each ingested photo: store it and hand it to this session
+    def save_upload():
+        save_path, _ = upload_page.save_ingested("bench.jpg", ingested)
+        os.remove(save_path)
+        upload_page.st.session_state.clear()
+
+    stages = {
+        "ingest_upload": lambda: ingest_upload(data),
+        "save_ingested": save_upload,
+        "decode": lambda: cv2.imdecode(encoded, cv2.IMREAD_COLOR),
+        "white_balance": lambda: white_balance(image),
+        "enhance_image": lambda: enhance_image(image),
+        "normalize_lab": lambda: normalize_lab(image),
+        "skin_mask": lambda: skin_mask(enhanced),
+        "most_frequent_color": lambda: most_frequent_color(image, mask),
+        "analyze_skin": lambda: analyze_skin(image, keypoints),
+        "extract_measurements": lambda: extract_measurements(keypoints),
+        "classify_body_shape": lambda: classify_body_shape(measurements),
+        "analyze_body": lambda: analyze_body(image, keypoints),
+    }
+    if predictor is not None:
+        stages["detect_keypoints"] = lambda: detect_keypoints(predictor, image)
+    return stages
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# [(stage, size, metric, baseline, current)] for every metric that grew past tolerance
+def regressions(results, baseline, tolerance):
+    found = []
+    for size, stages in results["results"].items():
+        for stage, current in stages.items():
+            before = baseline.get("results", {}).get(size, {}).get(stage)
+            if before is None:
+                continue
+            for metric, floor in (("p50_ms", MIN_REGRESSION_MS), ("p90_ms", MIN_REGRESSION_MS),
+                                  ("alloc_peak_bytes", MIN_REGRESSION_BYTES)):
+                old, new = before.get(metric), current[metric]
+                if old is not None and new > old * (1 + tolerance) and new - old > floor:
+                    found.append((stage, size, metric, old, new))
+    return found
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES_MP), help="megapixels, comma separated")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stages", help="only these stages, comma separated")
+    parser.add_argument("--pose", action="store_true", help="also time detect_keypoints (needs the Detectron2 model)")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    sizes = [float(s) for s in args.sizes.split(",")]
+    wanted = set(args.stages.split(",")) if args.stages else None
+    predictor = None
+    if args.pose:
+        from fashion.models import build_keypoint_predictor
+        predictor = build_keypoint_predictor()
+
+    results = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        upload_page = load_upload_page(workdir)
+        print(f"{'stage':<22} {'MP':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'RSS +MB':>8} {'alloc MB':>9}")
+        for mp in sizes:
+            image = synthetic_photo(mp)
+            size_key = f"{mp:g}MP"
+            results["results"][size_key] = {}
+            cwd = os.getcwd()
+            os.chdir(workdir)  # the upload store writes to the relative img/ folder
+            try:
+                for name, fn in pipeline_stages(image, upload_page, predictor).items():
+                    if wanted and name not in wanted:
+                        continue
+                    stats = measure(fn, args.repeat)
+                    results["results"][size_key][name] = stats
+                    print(f"{name:<22} {mp:>5g} {stats['p50_ms']:>9.2f} {stats['p90_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+                          f"{stats['rss_peak_delta_bytes'] / 2**20:>8.1f} {stats['alloc_peak_bytes'] / 2**20:>9.1f}")
+            finally:
+                os.chdir(cwd)
+    results["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {args.out} (process peak RSS {results['peak_rss_bytes'] / 2**20:.0f} MB)")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; rerun with --save-baseline to store one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(results, baseline, args.tolerance)
+    print(f"Compared with baseline from commit {baseline.get('commit')}: "
+          f"{len(found)} regression(s) beyond {args.tolerance:.0%}")
+    for stage, size, metric, old, new in found:
+        print(f"  REGRESSION {stage} @ {size} {metric}: {old:.2f} -> {new:.2f} ({new / old - 1:+.0%})")
+    return 1 if found else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
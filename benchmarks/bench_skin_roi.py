@@ -0,0 +1,62 @@
+# Pixels processed and time per request for the skin-tone stage, by ROI mode.
+#   python benchmarks/bench_skin_roi.py [--images DIR] [--synthetic-pose]
+# Keypoints come from the configured pose backend; --synthetic-pose uses a
+# centred standing skeleton instead so the script runs without a pose model.
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.roi import skin_roi
+from fashion.backend import analyze_skin, detect_pose
+from fashion.preprocess import skin_input
+from synthetic import synthetic_keypoints
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("off", "person", "regions")
+
+def pixels_processed(image, keypoints, mode):
+    crop, region = skin_roi(image, keypoints, mode)
+    small = skin_input(crop)
+    counted = small.shape[0] * small.shape[1]
+    if region is not None:
+        counted = int(np.count_nonzero(region) * counted / region.size)
+    return small.shape[0] * small.shape[1], counted
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", default=os.path.join(ROOT, "img"))
+    parser.add_argument("--synthetic-pose", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "webp") for p in glob.glob(os.path.join(args.images, f"*.{ext}")))
+    print(f"{'image':<42} {'mode':<8} {'processed px':>12} {'masked px':>10} {'ms':>7} {'hex':>8}")
+    totals = {mode: [0, 0.0] for mode in MODES}
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        keypoints = synthetic_keypoints(image.shape) if args.synthetic_pose else detect_pose(image)
+        for mode in MODES:
+            processed, counted = pixels_processed(image, keypoints, mode)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                result = analyze_skin(image, keypoints, roi_mode=mode)
+            ms = (time.perf_counter() - start) / args.repeat * 1000
+            totals[mode][0] += processed
+            totals[mode][1] += ms
+            print(f"{os.path.basename(path)[:42]:<42} {mode:<8} {processed:>12} {counted:>10} {ms:>7.1f} {result['skin_hex']:>8}")
+
+    base_px = totals["off"][0] or 1
+    print("\nTotals vs whole frame:")
+    for mode, (px, ms) in totals.items():
+        print(f"  {mode:<8} {px / base_px:>6.0%} of pixels, {ms:>8.1f} ms")
+
+if __name__ == "__main__":
+    main()
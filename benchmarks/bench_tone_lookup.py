@@ -0,0 +1,51 @@
+# Throughput of skin-tone classification: per-colour loop vs vectorized vs LUT.
+#   python benchmarks/bench_tone_lookup.py [--colors 100000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.tones import SKIN_TONES, nearest_tone_index, tone_lut, classify_colors
+
+
+# The loop find_nearest_skin_color() used to run inside main()
+def legacy_find_nearest_skin_color(detected_rgb):
+    min_dist = float('inf')
+    closest_hex = None
+    for hex_code in SKIN_TONES:
+        palette_rgb = np.array([int(hex_code[1:3], 16), int(hex_code[3:5], 16), int(hex_code[5:7], 16)])
+        dist = np.linalg.norm(np.array(detected_rgb) - palette_rgb)
+        if dist < min_dist:
+            min_dist = dist
+            closest_hex = hex_code
+    return closest_hex, SKIN_TONES.get(closest_hex, "Winter")
+
+def rate(fn, n):
+    start = time.perf_counter()
+    result = fn()
+    return n / ((time.perf_counter() - start) * 1000), result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--colors", type=int, default=100000)
+    args = parser.parse_args()
+    colors = np.random.default_rng(0).integers(0, 256, (args.colors, 3)).astype(np.uint8)
+    legacy_n = min(args.colors, 2000)
+
+    print(f"{'method':<22} {'colours/ms':>12} {'agreement':>10}")
+    legacy_rate, _ = rate(lambda: [legacy_find_nearest_skin_color(c) for c in colors[:legacy_n]], legacy_n)
+    print(f"{'legacy loop':<22} {legacy_rate:>12.1f} {'-':>10}")
+    for space in ("rgb", "lab"):
+        exact_rate, exact = rate(lambda: nearest_tone_index(colors, space), args.colors)
+        start = time.perf_counter()
+        tone_lut(space)
+        build_ms = (time.perf_counter() - start) * 1000
+        lut_rate, (tones, _) = rate(lambda: classify_colors(colors, space), args.colors)
+        print(f"{'vectorized ' + space:<22} {exact_rate:>12.1f} {'-':>10}")
+        print(f"{'LUT ' + space:<22} {lut_rate:>12.1f} {(tones == exact).mean():>10.1%}  (built in {build_ms:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
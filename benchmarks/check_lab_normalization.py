@@ -0,0 +1,66 @@
+# Compare the fused normalize_lab() with white_balance() + enhance_image().
+#   python benchmarks/check_lab_normalization.py [--images DIR] [--sizes 0.3 2 12] [--tolerance 3]
+# Prints speed and pixel differences and exits non-zero if the mean absolute
+# difference of either output exceeds the tolerance (in 8-bit levels).
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.color import white_balance, enhance_image, normalize_lab
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scaled_fixture(image, megapixels):
+    h, w = image.shape[:2]
+    scale = np.sqrt(megapixels * 1e6 / (h * w))
+    return cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+
+def best_of(fn, img, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(img)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def two_pass(img):
+    wb = white_balance(img)
+    return wb, enhance_image(wb)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", default=os.path.join(ROOT, "img"))
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.3, 2.0, 12.0])
+    parser.add_argument("--tolerance", type=float, default=3.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "webp") for p in glob.glob(os.path.join(args.images, f"*.{ext}")))
+    print(f"{'image':<30} {'MP':>5} {'2-pass ms':>10} {'fused ms':>9} {'balanced mean/max':>18} {'enhanced mean/max':>18}")
+    failed = False
+    for path in paths:
+        base = cv2.imread(path)
+        if base is None:
+            continue
+        for mp in args.sizes:
+            img = scaled_fixture(base, mp)
+            t_old, (wb_old, en_old) = best_of(two_pass, img, args.repeat)
+            t_new, (wb_new, en_new) = best_of(normalize_lab, img, args.repeat)
+            diffs = []
+            for old, new in ((wb_old, wb_new), (en_old, en_new)):
+                d = cv2.absdiff(old, new)
+                diffs.append((float(d.mean()), int(d.max())))
+            failed |= any(mean > args.tolerance for mean, _ in diffs)
+            print(f"{os.path.basename(path)[:30]:<30} {mp:>5} {t_old * 1000:>10.1f} {t_new * 1000:>9.1f} "
+                  f"{diffs[0][0]:>12.3f}/{diffs[0][1]:<5} {diffs[1][0]:>12.3f}/{diffs[1][1]:<5}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Accuracy/latency comparison of pose backends against a reference backend.
+#   python benchmarks/compare_pose_backends.py [--images DIR] [--reference detectron2] [--backends movenet]
+# Reports per-backend latency and how often classify_body_shape agrees with the
+# reference, plus the mean keypoint distance relative to shoulder width.
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.body import LEFT_SHOULDER, RIGHT_SHOULDER, extract_measurements, classify_body_shape, primary_subject
+from fashion.pose import BACKENDS, get_pose_backend
+from fashion.preprocess import pose_input, rescale_keypoints
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fixture_images(directory):
+    paths = []
+    for ext in ("jpg", "jpeg", "png", "webp"):
+        paths.extend(glob.glob(os.path.join(directory, f"*.{ext}")))
+    return sorted(paths)
+
+def run_backend(backend, img):
+    pose_img, scale = pose_input(img)
+    start = time.perf_counter()
+    keypoints = backend.detect(pose_img)
+    seconds = time.perf_counter() - start
+    keypoints = rescale_keypoints(keypoints, scale)
+    index = primary_subject(keypoints) if len(keypoints) else None
+    if index is None:
+        return seconds, None, None
+    try:
+        shape = classify_body_shape(extract_measurements(keypoints[index:index + 1]))
+    except ValueError:
+        return seconds, None, None
+    return seconds, keypoints[index], shape
+
+def normalized_error(kp, ref):
+    shoulder = np.linalg.norm(ref[LEFT_SHOULDER, :2] - ref[RIGHT_SHOULDER, :2]) or 1.0
+    return float(np.linalg.norm(kp[:, :2] - ref[:, :2], axis=1).mean() / shoulder)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", default=os.path.join(ROOT, "img"))
+    parser.add_argument("--reference", default="detectron2")
+    parser.add_argument("--backends", nargs="+", default=[n for n in BACKENDS if n != "detectron2"])
+    args = parser.parse_args()
+
+    paths = fixture_images(args.images)
+    if not paths:
+        sys.exit(f"No images found in {args.images}")
+    images = [(p, cv2.imread(p)) for p in paths]
+    images = [(p, img) for p, img in images if img is not None]
+
+    reference = get_pose_backend(args.reference)
+    ref_results = {p: run_backend(reference, img) for p, img in images}
+    ref_ms = np.mean([r[0] for r in ref_results.values()]) * 1000
+    print(f"{'backend':<12} {'mean ms':>8} {'agree':>7} {'kp err':>7}  (vs {args.reference}, {len(images)} images)")
+    print(f"{args.reference:<12} {ref_ms:>8.1f} {'-':>7} {'-':>7}")
+
+    for name in args.backends:
+        try:
+            backend = get_pose_backend(name)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        times, agree, compared, errors = [], 0, 0, []
+        for p, img in images:
+            seconds, kp, shape = run_backend(backend, img)
+            times.append(seconds)
+            _, ref_kp, ref_shape = ref_results[p]
+            if ref_shape is None:
+                continue
+            compared += 1
+            agree += shape == ref_shape
+            if kp is not None:
+                errors.append(normalized_error(kp, ref_kp))
+        agreement = f"{agree / compared:.0%}" if compared else "-"
+        error = f"{np.mean(errors):.3f}" if errors else "-"
+        print(f"{name:<12} {np.mean(times) * 1000:>8.1f} {agreement:>7} {error:>7}")
+
+if __name__ == "__main__":
+    main()
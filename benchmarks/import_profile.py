@@ -0,0 +1,59 @@
+# Import-time profile of the modules each page pulls in, from `python -X importtime`.
+#   python benchmarks/import_profile.py [--top 15] [module ...]
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "streamlit",
+    "fashion.handoff",
+    "fashion.result_cache",
+    "fashion.ingest",
+    "fashion.backend",
+    "fashion.models",
+    "duckduckgo_search",
+]
+
+# Returns [(cumulative_us, self_us, name)] for every import, or None if the import failed
+def profile(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="slowest sub-imports to list per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<28} {'total ms':>9}")
+    details = {}
+    for module in args.modules:
+        rows = profile(module)
+        if rows is None:
+            print(f"{module:<28} {'not importable':>9}")
+            continue
+        total = next((r[0] for r in rows if r[2] == module), max(r[0] for r in rows))
+        print(f"{module:<28} {total / 1000:>9.1f}")
+        details[module] = rows
+
+    for module, rows in details.items():
+        print(f"\n{module}: slowest imports (cumulative ms, self ms)")
+        for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative_us / 1000:>9.1f} {self_us / 1000:>8.1f}  {name}")
+
+if __name__ == "__main__":
+    main()
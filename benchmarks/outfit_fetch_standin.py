@@ -0,0 +1,80 @@
+# Exercise the outfit image fetcher against a local stand-in image host.
+#   python benchmarks/outfit_fetch_standin.py [--deadline 2]
+# Routes: /ok (small JPEG), /slow (JPEG after a delay), /fail (500), /big (over
+# the byte limit), /garbage (not an image).
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.outfits import fetch_outfit_images
+
+SLOW_SECONDS = 5.0
+
+def sample_jpeg(side=1200):
+    buf = BytesIO()
+    Image.new("RGB", (side, side), (200, 150, 120)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+JPEG = sample_jpeg()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="image/jpeg"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/ok":
+            self._send(200, JPEG)
+        elif path == "/slow":
+            time.sleep(SLOW_SECONDS)
+            self._send(200, JPEG)
+        elif path == "/fail":
+            self._send(500, b"error", "text/plain")
+        elif path == "/big":
+            self._send(200, b"\0" * (6 * 1024 * 1024))
+        elif path == "/garbage":
+            self._send(200, b"not an image")
+        else:
+            self._send(404, b"", "text/plain")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deadline", type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    routes = ["/ok", "/slow", "/fail", "/big", "/garbage", "/ok?second"]
+    start = time.perf_counter()
+    results = fetch_outfit_images([base + r for r in routes], deadline_seconds=args.deadline)
+    elapsed = time.perf_counter() - start
+
+    for route, thumb in zip(routes, results):
+        print(f"{route:<12} {'%d bytes' % len(thumb) if thumb else 'skipped'}")
+    print(f"\nbatch took {elapsed:.2f}s with a {args.deadline:.1f}s deadline "
+          f"(sequential worst case would be {SLOW_SECONDS:.0f}s+)")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Quality-vs-speed report for the downsampling stage.
+#   python benchmarks/report_resolution.py [--images DIR] [--skin-sides 0 1600 800 512] [--pose]
+# Side 0 means full resolution and is the reference for every other row.
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fashion.color import white_balance, enhance_image, skin_mask, most_frequent_color
+from fashion.preprocess import resize_to_max_side, rescale_keypoints
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fixture_images(directory):
+    paths = []
+    for ext in ("jpg", "jpeg", "png", "webp"):
+        paths.extend(glob.glob(os.path.join(directory, f"*.{ext}")))
+    return sorted(paths)
+
+def skin_tone(img, side, mode):
+    start = time.perf_counter()
+    small, _ = resize_to_max_side(img, side)
+    wb_img = white_balance(small)
+    mask = skin_mask(enhance_image(wb_img))
+    color, hex_color = most_frequent_color(wb_img, mask, mode=mode)
+    return time.perf_counter() - start, color, hex_color
+
+def color_error(a, b):
+    return float(np.linalg.norm(np.array(a, dtype=float) - np.array(b, dtype=float)))
+
+def skin_report(paths, sides, mode):
+    print(f"\nSkin tone ({mode} mode): time and BGR distance from full resolution")
+    print(f"{'image':<42} {'side':>5} {'ms':>8} {'hex':>8} {'dist':>6}")
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        _, ref_color, _ = skin_tone(img, 0, mode)
+        for side in sides:
+            seconds, color, hex_color = skin_tone(img, side, mode)
+            print(f"{os.path.basename(path)[:42]:<42} {side or 'full':>5} {seconds * 1000:>8.1f} "
+                  f"{hex_color:>8} {color_error(color, ref_color):>6.1f}")
+
+def pose_report(paths, sides):
+    from fashion.models import get_predictor_pool
+    from fashion.body import detect_keypoints, extract_measurements, classify_body_shape, primary_subject
+
+    pool = get_predictor_pool()
+    print("\nBody shape: time and agreement with full resolution")
+    print(f"{'image':<42} {'side':>5} {'ms':>8} {'shape':>18} {'same':>5}")
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        reference = None
+        for side in [0] + [s for s in sides if s]:
+            start = time.perf_counter()
+            small, scale = resize_to_max_side(img, side)
+            with pool.acquire() as model:
+                _, keypoints = detect_keypoints(model, small)
+            keypoints = rescale_keypoints(keypoints, scale)
+            seconds = time.perf_counter() - start
+            measurable = primary_subject(keypoints) is not None
+            shape = classify_body_shape(extract_measurements(keypoints)) if measurable else "no person"
+            reference = reference or shape
+            print(f"{os.path.basename(path)[:42]:<42} {side or 'full':>5} {seconds * 1000:>8.1f} "
+                  f"{shape:>18} {str(shape == reference):>5}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", default=os.path.join(ROOT, "img"))
+    parser.add_argument("--skin-sides", type=int, nargs="+", default=[0, 1600, 1024, 800, 512])
+    parser.add_argument("--pose-sides", type=int, nargs="+", default=[1333, 800, 640])
+    parser.add_argument("--pose", action="store_true", help="also run the keypoint model")
+    args = parser.parse_args()
+
+    paths = fixture_images(args.images)
+    if not paths:
+        sys.exit(f"No images found in {args.images}")
+    for mode in ("exact", "quantized"):
+        skin_report(paths, args.skin_sides, mode)
+    if args.pose:
+        pose_report(paths, args.pose_sides)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Synthetic test subjects shared by the benchmarks: a standing COCO-17 skeleton,
+# its keypoints for any frame size, and a portrait photo drawn around it.
+#   from synthetic import SKELETON, synthetic_keypoints, synthetic_photo
+import numpy as np
+import cv2
+
+# Normalized (x, y) of a front-facing person filling the middle of the frame (COCO order)
+SKELETON = np.array([
+    (0.50, 0.12), (0.48, 0.10), (0.52, 0.10), (0.46, 0.11), (0.54, 0.11),
+    (0.40, 0.22), (0.60, 0.22), (0.37, 0.37), (0.63, 0.37), (0.36, 0.50),
+    (0.64, 0.50), (0.44, 0.52), (0.56, 0.52), (0.44, 0.72), (0.56, 0.72),
+    (0.44, 0.92), (0.56, 0.92),
+])
+
+# A 3:4 portrait: textured background, clothed body and skin-coloured face and
+# arms, with sensor-like noise so colour counting sees realistic variety
+def synthetic_photo(megapixels, seed=0):
+    w = int(round((megapixels * 1e6 * 3 / 4) ** 0.5))
+    h = int(round(w * 4 / 3))
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+    image = np.empty((h, w, 3), dtype=np.uint8)
+    image[..., 0] = 150 + 60 * x / w
+    image[..., 1] = 170 - 40 * y / h
+    image[..., 2] = 190
+    points = (SKELETON * (w, h)).astype(np.int32)
+    thickness = max(2, w // 25)
+    cv2.rectangle(image, tuple(points[5] - (0, thickness)), tuple(points[12] + (0, thickness)), (70, 40, 120), -1)
+    cv2.rectangle(image, tuple(points[11]), tuple(points[16]), (80, 60, 40), -1)
+    skin = (120, 150, 205)
+    cv2.ellipse(image, tuple(points[0]), (w // 14, h // 16), 0, 0, 360, skin, -1)
+    for a, b in ((5, 7), (7, 9), (6, 8), (8, 10)):
+        cv2.line(image, tuple(points[a]), tuple(points[b]), skin, thickness)
+    noise = rng.integers(-6, 7, size=(h, w, 1), dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+def synthetic_keypoints(shape):
+    h, w = shape[:2]
+    kp = np.ones((1, 17, 3), dtype=np.float32)
+    kp[0, :, 0] = SKELETON[:, 0] * w
+    kp[0, :, 1] = SKELETON[:, 1] * h
+    return kp
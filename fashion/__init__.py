@@ -0,0 +1,2 @@
+# Shared analysis code used by the Streamlit pages and offline tools.
+# Keep this file free of imports so pages only pay for what they use.
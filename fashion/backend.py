@@ -0,0 +1,149 @@
+import os
+import logging
+
+import cv2
+import numpy as np
+
+from fashion.metrics import span
+from fashion.color import normalize_lab, skin_mask, most_frequent_color, bgr_to_hex
+from fashion.body import extract_measurements, classify_body_shape, aggregate_measurements
+from fashion.preprocess import skin_input, pose_input, rescale_keypoints
+from fashion.roi import SKIN_ROI, skin_roi
+from fashion.tones import find_nearest_skin_color
+
+logger = logging.getLogger(__name__)
+
+STAGE_MODE = os.environ.get("FASHION_STAGE_MODE", "roi")
+# Channel order the tone lookup reads detected (OpenCV, BGR) colours in.
+# FASHION_TONE_ORDER=rgb opts back into the original lookup, which matched
+# them against the RGB reference tones as-is, e.g. to compare with old results.
+TONE_ORDER = os.environ.get("FASHION_TONE_ORDER", "bgr")
+
+# Analysis stages behind the recommendations page. Pages import this module
+# only once they actually have work to do; torch/detectron2 and the search
+# client are imported on first use of the stage that needs them.
+
+# Skin tone stage: detected colour, nearest reference tone and season.
+# With keypoints, only the person (and their face/forearms) is analyzed; see fashion.roi.
+def analyze_skin(original, keypoints=None, roi_mode=SKIN_ROI):
+    with span("skin.roi"):
+        crop, region = skin_roi(original, keypoints, roi_mode)
+    with span("skin.normalize"):
+        wb_img, enhanced_img = normalize_lab(skin_input(crop))
+    with span("skin.mask"):
+        mask = skin_mask(enhanced_img)
+        if region is not None:
+            region = cv2.resize(region, (mask.shape[1], mask.shape[0]), interpolation=cv2.INTER_NEAREST)
+            in_region = cv2.bitwise_and(mask, region)
+            if cv2.countNonZero(in_region):
+                mask = in_region
+    with span("skin.dominant_color"):
+        detected_color, hex_color = most_frequent_color(wb_img, mask)
+    with span("skin.tone_lookup"):
+        rounded_hex, season = find_nearest_skin_color(detected_color, order=TONE_ORDER)
+    return {"skin_bgr": list(detected_color), "skin_hex": hex_color,
+            "nearest_tone": rounded_hex, "season": season}
+
+# Pose stage: (N, 17, 3) keypoints in original image coordinates
+def detect_pose(original):
+    from fashion.pose import get_pose_backend
+    pose_img, pose_scale = pose_input(original)
+    return rescale_keypoints(get_pose_backend().detect(pose_img), pose_scale)
+
+# Body shape stage: measurements from keypoints and the resulting shape
+def analyze_body(original, keypoints=None):
+    if keypoints is None:
+        keypoints = detect_pose(original)
+    with span("body.measurements"):
+        measures = extract_measurements(keypoints)
+        return {"measurements": measures, "body_shape": classify_body_shape(measures)}
+
+# One skin tone and body shape from several photos of the same person: the
+# per-channel median of their skin colours and their averaged measurements.
+# Takes each photo's job results; photos where a stage failed are left out.
+def consolidate(analyses):
+    skins = [a["skin"] for a in analyses if a.get("skin")]
+    bodies = [a["body"] for a in analyses if a.get("body")]
+    combined = {"photos": len(analyses), "skin_photos": len(skins), "body_photos": len(bodies)}
+    if skins:
+        detected_color = tuple(int(c) for c in np.median([s["skin_bgr"] for s in skins], axis=0).round())
+        rounded_hex, season = find_nearest_skin_color(detected_color, order=TONE_ORDER)
+        combined["skin"] = {"skin_bgr": list(detected_color), "skin_hex": bgr_to_hex(detected_color),
+                            "nearest_tone": rounded_hex, "season": season}
+    if bodies:
+        measures = aggregate_measurements([b["measurements"] for b in bodies])
+        combined["body"] = {"measurements": measures, "body_shape": classify_body_shape(measures)}
+    return combined
+
+# Stage graph for one photo: decode, then pose, skin, body and outfit inspiration.
+# In "parallel" mode (or with FASHION_SKIN_ROI=off) skin runs on the whole frame
+# at the same time as pose, so wall time is max(skin, pose + body) instead of the
+# sum; in "roi" mode skin waits for the keypoints and only looks at the person,
+# falling back to the whole frame if pose detection fails. Without inspiration
+# (photo sets search once for the combined result) the graph stops at skin/body.
+def analysis_stages(mode=STAGE_MODE, roi_mode=SKIN_ROI, with_inspiration=True):
+    from fashion.handoff import decode_image
+    from fashion.jobs import Stage
+    from fashion.search_cache import get_outfit_search_cache
+
+    if mode not in ("roi", "parallel"):
+        raise ValueError(f"Unknown stage mode: {mode}")
+    if mode == "parallel":
+        roi_mode = "off"
+    skin_optional = () if roi_mode == "off" else ("pose",)
+    stages = [
+        Stage("image", ("data",), lambda r: _decoded(decode_image(r["data"]))),
+        Stage("pose", ("image",), lambda r: detect_pose(r["image"])),
+        Stage("skin", ("image",), lambda r: analyze_skin(r["image"], r.get("pose"), roi_mode), skin_optional),
+        Stage("body", ("image", "pose"), lambda r: analyze_body(r["image"], r["pose"])),
+    ]
+    if with_inspiration:
+        stages.append(Stage("inspiration", ("skin", "body"),
+                            lambda r: get_outfit_search_cache().get(r["skin"]["season"], r["body"]["body_shape"])))
+    return stages
+
+# Bulky results not needed once a job is done (the page only renders skin/body/inspiration)
+INTERMEDIATE_RESULTS = ("data", "image", "pose")
+
+def _decoded(image):
+    if image is None:
+        raise ValueError("Failed to load image.")
+    return image
+
+# Start (or join) the background job for this photo. `cached` is whatever the result
+# cache already holds for it; those stages are not rerun. Finished skin/body results
+# are written back to the result cache even if the page is gone by then.
+# Jobs without inspiration get their own key, so a single-photo page never joins one.
+def submit_analysis(cache_key, data, cached=None, with_inspiration=True):
+    from fashion.jobs import get_job_runner
+    from fashion.result_cache import get_result_cache
+
+    inputs = {"data": data}
+    cached = cached or {}
+    if "season" in cached:
+        inputs["skin"] = {k: cached[k] for k in ("skin_bgr", "skin_hex", "nearest_tone", "season")}
+    if "body_shape" in cached:
+        inputs["body"] = {k: cached[k] for k in ("measurements", "body_shape")}
+
+    def on_complete(job):
+        if "skin" in job.results and "body" in job.results:
+            get_result_cache().put(cache_key, {**job.results["skin"], **job.results["body"]})
+
+    job_key = cache_key if with_inspiration else f"{cache_key}:photo-set"
+    stages = analysis_stages(with_inspiration=with_inspiration)
+    return get_job_runner().submit(job_key, stages, inputs, on_complete, INTERMEDIATE_RESULTS)
+
+# Import everything the stages need; with load_model=True also load the pose model.
+# The configured search provider's client is imported last; if that fails the
+# inspiration stage reports it, and the pose model is already loaded.
+def preload(load_model=False):
+    from fashion.pose import DEFAULT_BACKEND, get_pose_backend
+    from fashion.search_cache import get_outfit_search_cache
+    if DEFAULT_BACKEND == "detectron2":
+        import fashion.models  # noqa: F401
+    if load_model:
+        get_pose_backend()
+    try:
+        get_outfit_search_cache().provider.preload()
+    except ImportError as e:
+        logger.warning("Search provider not preloaded: %s", e)
@@ -0,0 +1,219 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import cv2
+
+from fashion.backend import analyze_skin
+from fashion.body import extract_measurements, classify_body_shape, aggregate_measurements
+from fashion.preprocess import pose_input, rescale_keypoints
+
+# Headless analysis of a directory or manifest of images.
+#   python -m fashion.batch img/ --out results.jsonl [--parquet results.parquet]
+# Colour stages run in a process pool; the pose stage runs in this process in
+# batches through the configured pose backend. Results stream to JSONL, one
+# line per image, and rerunning with the same --out skips images already in
+# the file. With --people, photos in the same directory are taken to be the
+# same person and their measurements are averaged into one body shape each.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff")
+# Colour results (with their pose inputs) allowed in flight, in pose batches or worker counts
+IN_FLIGHT_BATCHES = 4
+
+# A directory (recursed), a .jsonl manifest with a "path" field, or a text file with one path per line
+def list_inputs(source):
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+        return sorted(paths)
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if source.endswith(".jsonl"):
+        lines = [json.loads(line)["path"] for line in lines]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in lines]
+
+def completed_paths(out_path):
+    done = set()
+    if os.path.exists(out_path):
+        with open(out_path) as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue  # partial last line from an interrupted run
+    return done
+
+# Runs in a worker process: decode, skin-tone stage and the resized pose input
+def color_stage(path):
+    start = time.perf_counter()
+    record = {"path": path}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        record["sha256"] = hashlib.sha256(data).hexdigest()
+        original = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if original is None:
+            raise ValueError("not a decodable image")
+        record.update(analyze_skin(original))
+        pose_img, pose_scale = pose_input(original)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        pose_img, pose_scale = None, 1.0
+    record["color_seconds"] = time.perf_counter() - start
+    return record, pose_img, pose_scale
+
+def pose_stage(pose_backend, pending):
+    start = time.perf_counter()
+    outputs = pose_backend.detect_batch([img for _, img, _ in pending])
+    per_image = (time.perf_counter() - start) / len(pending)
+    for (record, _, scale), keypoints in zip(pending, outputs):
+        record["pose_seconds"] = per_image
+        try:
+            keypoints = rescale_keypoints(keypoints, scale)
+            record["people_detected"] = len(keypoints)
+            record["measurements"] = extract_measurements(keypoints)
+            record["body_shape"] = classify_body_shape(record["measurements"])
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+
+def write_parquet(jsonl_path, parquet_path):
+    import pandas as pd  # optional dependency, only for --parquet
+    records = []
+    with open(jsonl_path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    pd.json_normalize(records).to_parquet(parquet_path, index=False)
+
+
+# One line per directory: photos, how many had a measurable person, averaged measurements and shape
+def write_people(jsonl_path, people_path):
+    groups = {}
+    with open(jsonl_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            groups.setdefault(os.path.dirname(record["path"]), []).append(record.get("measurements"))
+    with open(people_path, "w") as out:
+        for directory, measurements in sorted(groups.items()):
+            person = {"directory": directory, "photos": len(measurements),
+                      "measured_photos": sum(1 for m in measurements if m)}
+            try:
+                person["measurements"] = aggregate_measurements(measurements)
+                person["body_shape"] = classify_body_shape(person["measurements"])
+            except ValueError as e:
+                person["error"] = str(e)
+            out.write(json.dumps(person) + "\n")
+
+
+class Throughput:
+    def __init__(self, total, every=10.0):
+        self.total = total
+        self.every = every
+        self.start = self.last_report = time.perf_counter()
+        self.done = 0
+        self.errors = 0
+        self.color_seconds = 0.0
+        self.pose_seconds = 0.0
+
+    def add(self, record):
+        self.done += 1
+        self.errors += "error" in record
+        self.color_seconds += record.get("color_seconds", 0.0)
+        self.pose_seconds += record.get("pose_seconds", 0.0)
+        now = time.perf_counter()
+        if now - self.last_report >= self.every:
+            self.last_report = now
+            self.report(file=sys.stderr)
+
+    def report(self, file=sys.stdout):
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        n = max(self.done, 1)
+        print(f"{self.done}/{self.total} images, {self.errors} errors, {elapsed:.1f}s, {rate:.2f} img/s "
+              f"(colour {self.color_seconds / n * 1000:.0f} ms/img in workers, "
+              f"pose {self.pose_seconds / n * 1000:.0f} ms/img)", file=file)
+
+# pool.map, in order, but with at most `limit` items submitted and not yet consumed.
+# pool.map queues every input up front and buffers every finished result, pose
+# image included, until the parent catches up.
+def bounded_map(pool, fn, items, limit):
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def run(source, out_path, workers=None, batch_size=4, with_pose=True, pose_backend=None):
+    paths = list_inputs(source)
+    done = completed_paths(out_path)
+    todo = [p for p in paths if p not in done]
+    print(f"{len(paths)} images, {len(done & set(paths))} already done, {len(todo)} to process", file=sys.stderr)
+    stats = Throughput(len(todo))
+    if not todo:
+        return stats
+
+    pose = None
+    if with_pose:
+        from fashion.pose import get_pose_backend
+        pose = get_pose_backend(pose_backend)
+
+    with open(out_path, "a") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        def emit(record):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            stats.add(record)
+
+        pending = []
+        limit = IN_FLIGHT_BATCHES * max(batch_size, workers or os.cpu_count() or 1)
+        for record, pose_img, scale in bounded_map(pool, color_stage, todo, limit):
+            if pose is None or pose_img is None:
+                emit(record)
+                continue
+            pending.append((record, pose_img, scale))
+            if len(pending) >= batch_size:
+                pose_stage(pose, pending)
+                for item in pending:
+                    emit(item[0])
+                pending = []
+        if pending:
+            pose_stage(pose, pending)
+            for item in pending:
+                emit(item[0])
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory or manifest of images.")
+    parser.add_argument("source", help="image directory, .txt list of paths or .jsonl manifest")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL output, appended to and used for resuming")
+    parser.add_argument("--parquet", help="also write all results to this Parquet file when done")
+    parser.add_argument("--people", help="also write one averaged body shape per directory to this JSONL file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes for the colour stages")
+    parser.add_argument("--batch-size", type=int, default=4, help="images per keypoint model forward pass")
+    parser.add_argument("--no-pose", action="store_true", help="skip body shape (no torch/detectron2 needed)")
+    parser.add_argument("--pose-backend", help="pose backend name (default: FASHION_POSE_BACKEND or detectron2)")
+    args = parser.parse_args()
+
+    stats = run(args.source, args.out, args.workers, args.batch_size, not args.no_pose, args.pose_backend)
+    stats.report()
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+    if args.people:
+        write_people(args.out, args.people)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+
+# Body measurements from COCO-17 keypoints, as returned by every pose backend:
+# an (N, 17, 3) array of (x, y, score), one row per detected person.
+
+KEYPOINT_NAMES = (
+    "nose", "left_eye", "right_eye", "left_ear", "right_ear",
+    "left_shoulder", "right_shoulder", "left_elbow", "right_elbow",
+    "left_wrist", "right_wrist", "left_hip", "right_hip",
+    "left_knee", "right_knee", "left_ankle", "right_ankle",
+)
+LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW = 5, 6, 7, 8
+LEFT_HIP, RIGHT_HIP = 11, 12
+REQUIRED_KEYPOINTS = [LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_HIP, RIGHT_HIP]
+MEASUREMENTS = ("shoulders", "bust", "waist", "hips")
+# Keypoints scored below this are treated as not visible (Detectron2's own drawing threshold)
+MIN_KEYPOINT_SCORE = float(os.environ.get("FASHION_MIN_KEYPOINT_SCORE", "0.05"))
+
+# Perform Keypoint Detection
+def detect_keypoints(model, image):
+    outputs = model(image)
+    keypoints = outputs["instances"].pred_keypoints.cpu().numpy()
+    return image, keypoints
+
+# (N, 4) widths in MEASUREMENTS order for every person at once. Bust is taken
+# halfway down the upper arm, waist at hip x and elbow height.
+def measurement_array(keypoints):
+    xy = np.asarray(keypoints, dtype=np.float64).reshape(-1, 17, 3)[..., :2]
+    shoulder, elbow, hip = xy[:, [LEFT_SHOULDER, RIGHT_SHOULDER]], xy[:, [LEFT_ELBOW, RIGHT_ELBOW]], xy[:, [LEFT_HIP, RIGHT_HIP]]
+    bust = np.stack([shoulder[..., 0], (shoulder[..., 1] + elbow[..., 1]) / 2], axis=-1)
+    waist = np.stack([hip[..., 0], elbow[..., 1]], axis=-1)
+    points = np.stack([shoulder, bust, waist, hip], axis=1)  # (N, 4, left/right, xy)
+    return np.linalg.norm(points[:, :, 0] - points[:, :, 1], axis=-1)
+
+# (N,) True where every keypoint the measurements use is confidently visible
+def measurable(keypoints, min_score=MIN_KEYPOINT_SCORE):
+    keypoints = np.asarray(keypoints).reshape(-1, 17, 3)
+    return (keypoints[:, REQUIRED_KEYPOINTS, 2] >= min_score).all(axis=1)
+
+# Index of the person to measure: the largest keypoint box weighted by mean
+# keypoint score, among measurable people; None if nobody qualifies
+def primary_subject(keypoints, min_score=MIN_KEYPOINT_SCORE):
+    keypoints = np.asarray(keypoints).reshape(-1, 17, 3)
+    candidates = np.flatnonzero(measurable(keypoints, min_score))
+    if len(candidates) <= 1:
+        return int(candidates[0]) if len(candidates) else None
+    people = keypoints[candidates]
+    visible = people[..., 2:] >= min_score
+    xy = people[..., :2]
+    extent = np.where(visible, xy, -np.inf).max(axis=1) - np.where(visible, xy, np.inf).min(axis=1)
+    score = np.clip(people[:, REQUIRED_KEYPOINTS, 2].mean(axis=1), 0, None)
+    return int(candidates[np.argmax(extent[:, 0] * extent[:, 1] * score)])
+
+# Measurements of the primary subject; ValueError if nobody is measurable
+def extract_measurements(keypoints, min_score=MIN_KEYPOINT_SCORE):
+    keypoints = np.asarray(keypoints).reshape(-1, 17, 3)
+    index = primary_subject(keypoints, min_score)
+    if index is None:
+        raise ValueError("No person detected with visible shoulders, elbows and hips")
+    return dict(zip(MEASUREMENTS, measurement_array(keypoints[index])[0].tolist()))
+
+# One set of measurements from several photos of the same person. Each photo is
+# scaled to the same overall size first (the shape only depends on ratios);
+# the result is in the average photo's pixels. Empty or None entries are skipped.
+def aggregate_measurements(measurements_list):
+    rows = np.array([[m[k] for k in MEASUREMENTS] for m in measurements_list if m])
+    if len(rows) == 0:
+        raise ValueError("No measurable photos to aggregate")
+    scale = rows.mean(axis=1, keepdims=True)
+    scale[scale == 0] = 1.0
+    averaged = (rows / scale).mean(axis=0) * scale.mean()
+    return dict(zip(MEASUREMENTS, averaged.tolist()))
+
+def classify_body_shape(measurements):
+    bust, waist, hips, shoulders = measurements["bust"], measurements["waist"], measurements["hips"], measurements["shoulders"]
+
+    if waist <= bust * 0.65 and waist <= shoulders * 0.65:
+        return "hourglass"
+    elif shoulders / hips >= 1.5 or bust / hips >= 1.5:
+        return "inverted triangle"
+    elif hips / bust >= 1.1 and hips / shoulders >= 1.1:
+        return "pear"
+    else:
+        return "rectangle"
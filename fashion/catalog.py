@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+# Recommendation catalog: versioned JSON parsed once into read-only indexes keyed by
+# (body_shape, season, category). get_catalog() notices edits to the file and swaps
+# in the new version without a server restart; a file that fails to parse is
+# logged and the previous catalog stays in use.
+
+CATALOG_PATH = os.environ.get("FASHION_CATALOG", os.path.join(os.path.dirname(__file__), "data", "catalog.json"))
+RELOAD_CHECK_SECONDS = 2.0
+SUPPORTED_VERSION = 1
+NO_RECOMMENDATION = "No recommendation available."
+DEFAULT_PALETTE_SEASON = "Winter"
+
+
+class Catalog:
+    def __init__(self, data, mtime=None):
+        if data.get("version") != SUPPORTED_VERSION:
+            raise ValueError(f"Unsupported catalog version: {data.get('version')}")
+        self.version = data["version"]
+        self.mtime = mtime
+        self.categories = tuple(data["categories"])
+
+        items = {}
+        for item in data["recommendations"]:
+            key = (item["body_shape"], item["season"], item["category"])
+            items.setdefault(key, []).append(item["text"])
+        self._items = MappingProxyType({key: tuple(texts) for key, texts in items.items()})
+
+        # One ready-made dict per (shape, season) so a page render is a single lookup
+        tips = {}
+        for shape, season, _ in items:
+            tips[(shape, season)] = MappingProxyType({
+                category: " ".join(self._items.get((shape, season, category), (NO_RECOMMENDATION,)))
+                for category in self.categories
+            })
+        self._tips = MappingProxyType(tips)
+        self._empty_tip = MappingProxyType({category: NO_RECOMMENDATION for category in self.categories})
+        self._palettes = MappingProxyType({season: tuple(colors) for season, colors in data["palettes"].items()})
+        self._palette_html = MappingProxyType({season: palette_grid_html(colors) for season, colors in self._palettes.items()})
+
+    @classmethod
+    def from_file(cls, path):
+        mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), mtime)
+
+    def lookup(self, body_shape, season, category):
+        return self._items.get((body_shape, season, category), ())
+
+    def recommendations(self, season, body_shape):
+        return self._tips.get((body_shape, season), self._empty_tip)
+
+    def palette(self, season):
+        return self._palettes.get(season, self._palettes[DEFAULT_PALETTE_SEASON])
+
+    def palette_html(self, season):
+        return self._palette_html.get(season, self._palette_html[DEFAULT_PALETTE_SEASON])
+
+# Four-column grid of swatches with their hex codes, rendered as one markdown block
+def palette_grid_html(colors):
+    cells = "".join(
+        f'<div><div style="height: 80px; background-color: {color}; border-radius: 5px; margin-bottom: 4px;"></div>'
+        f'<div style="font-size: 0.8em; opacity: 0.7; margin-bottom: 10px;">{color}</div></div>'
+        for color in colors
+    )
+    return f'<div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 0 1rem;">{cells}</div>'
+
+
+_catalog = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+def get_catalog(path=CATALOG_PATH):
+    global _catalog, _last_check
+    now = time.monotonic()
+    if _catalog is not None and now - _last_check < RELOAD_CHECK_SECONDS:
+        return _catalog
+    with _lock:
+        if _catalog is not None and now - _last_check < RELOAD_CHECK_SECONDS:
+            return _catalog
+        _last_check = now
+        try:
+            if _catalog is None or os.path.getmtime(path) != _catalog.mtime:
+                _catalog = Catalog.from_file(path)
+                logger.info("Loaded recommendation catalog v%s from %s", _catalog.version, path)
+        except (OSError, ValueError, KeyError) as e:
+            if _catalog is None:
+                raise
+            logger.error("Keeping previous catalog; failed to reload %s: %s", path, e)
+    return _catalog
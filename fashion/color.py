@@ -0,0 +1,130 @@
+import threading
+
+import numpy as np
+import cv2
+
+KMEANS_CLUSTERS = 3
+KMEANS_SAMPLE = 20000
+# Above this many pixels a dense 2**24 bincount beats sorting with np.unique
+BINCOUNT_MIN_PIXELS = 1 << 20
+
+# White Balance
+def white_balance(img):
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB).astype(np.float32)
+    L, A, B = cv2.split(lab)
+    avg_a = np.average(A)
+    avg_b = np.average(B)
+    A = A - ((avg_a - 128) * (L / 255.0) * 1.1)
+    B = B - ((avg_b - 128) * (L / 255.0) * 1.1)
+    lab = cv2.merge([L, A, B])
+    lab = np.clip(lab, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+# CLAHE Enhancement
+def enhance_image(img):
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    cl = clahe.apply(l)
+    return cv2.cvtColor(cv2.merge((cl, a, b)), cv2.COLOR_LAB2BGR)
+
+_buffers = threading.local()
+
+# Per-thread scratch buffers for normalize_lab, reused while the frame size stays the same
+def _lab_buffers(shape):
+    if getattr(_buffers, "shape", None) != shape:
+        h, w = shape[:2]
+        _buffers.shape = shape
+        _buffers.lab = np.empty((h, w, 3), dtype=np.uint8)
+        _buffers.factor = np.empty((h, w), dtype=np.float32)
+        _buffers.channel = np.empty((h, w), dtype=np.float32)
+        _buffers.lightness = np.empty((h, w), dtype=np.uint8)
+        _buffers.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    return _buffers
+
+# white_balance followed by enhance_image in one pass: convert to LAB once, apply the
+# gray-world shift and CLAHE in place and return (balanced, enhanced) BGR images.
+# Skips the BGR->LAB round trip between the two, so enhanced can differ by a few levels.
+def normalize_lab(img):
+    buf = _lab_buffers(img.shape)
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB, dst=buf.lab)
+    _, avg_a, avg_b, _ = cv2.mean(lab)
+    np.multiply(lab[:, :, 0], np.float32(1.1 / 255.0), out=buf.factor)
+    for index, avg in ((1, avg_a), (2, avg_b)):
+        np.multiply(buf.factor, np.float32(avg - 128), out=buf.channel)
+        np.subtract(lab[:, :, index], buf.channel, out=buf.channel)
+        np.clip(buf.channel, 0, 255, out=buf.channel)
+        lab[:, :, index] = buf.channel
+    balanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+    cv2.extractChannel(lab, 0, buf.lightness)
+    cv2.insertChannel(buf.clahe.apply(buf.lightness), lab, 0)
+    enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+    return balanced, enhanced
+
+# YCrCb skin mask used on the enhanced image
+SKIN_LOWER = np.array([0, 135, 85])
+SKIN_UPPER = np.array([255, 180, 135])
+
+def skin_mask(enhanced_img):
+    ycrcb = cv2.cvtColor(enhanced_img, cv2.COLOR_BGR2YCrCb)
+    return cv2.inRange(ycrcb, SKIN_LOWER, SKIN_UPPER)
+
+def bgr_to_hex(bgr):
+    return "#{:02x}{:02x}{:02x}".format(*bgr[::-1])
+
+# Pack (B, G, R) uint8 rows into one uint32 key per pixel
+def pack_bgr(pixels):
+    pixels = pixels.astype(np.uint32)
+    return (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+
+def unpack_bgr(key):
+    key = int(key)
+    return ((key >> 16) & 0xFF, (key >> 8) & 0xFF, key & 0xFF)
+
+# Exact mode; ties go to the colour seen first, same as Counter.most_common
+def _exact_mode(pixels):
+    keys = pack_bgr(pixels)
+    if len(keys) >= BINCOUNT_MIN_PIXELS:
+        counts = np.bincount(keys, minlength=1 << 24)
+        per_pixel = counts[keys]
+    else:
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        per_pixel = counts[inverse]
+    return unpack_bgr(keys[np.argmax(per_pixel == counts.max())])
+
+# Histogram over the top `bits` of each channel; returns the mean colour of the fullest bin
+def _quantized_mode(pixels, bits):
+    shift = 8 - bits
+    q = (pixels >> shift).astype(np.uint32)
+    keys = (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+    best = np.argmax(np.bincount(keys, minlength=1 << (3 * bits)))
+    members = pixels[keys == best]
+    return tuple(int(round(v)) for v in members.mean(axis=0))
+
+# Centre of the largest k-means cluster over a random sample of the pixels
+def _kmeans_mode(pixels, clusters=KMEANS_CLUSTERS, sample=KMEANS_SAMPLE):
+    if len(pixels) > sample:
+        rng = np.random.default_rng(0)
+        pixels = pixels[rng.choice(len(pixels), sample, replace=False)]
+    k = min(clusters, len(pixels))
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
+    _, labels, centers = cv2.kmeans(pixels.astype(np.float32), k, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+    largest = np.argmax(np.bincount(labels.ravel(), minlength=k))
+    return tuple(int(round(v)) for v in np.clip(centers[largest], 0, 255))
+
+# Dominant colour of the masked pixels as (bgr_tuple, hex)
+# mode: "exact" (true mode), "quantized" (histogram with `bits` per channel) or "kmeans"
+def most_frequent_color(original_img, mask, mode="exact", bits=5):
+    pixels = original_img[mask > 0].reshape(-1, 3)
+    if len(pixels) == 0:
+        raise ValueError("No pixels selected by mask")
+    if mode == "exact":
+        color = _exact_mode(pixels)
+    elif mode == "quantized":
+        color = _quantized_mode(pixels, bits)
+    elif mode == "kmeans":
+        color = _kmeans_mode(pixels)
+    else:
+        raise ValueError(f"Unknown dominant color mode: {mode}")
+    return color, bgr_to_hex(color)
@@ -0,0 +1,109 @@
+import argparse
+import glob
+import os
+import sys
+import logging
+
+import numpy as np
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Export the keypoint R-CNN to a frozen TorchScript file for CPU serving, with
+# dynamic int8 quantization of its Linear layers (box head), and check that an
+# exported model still matches the float Detectron2 model.
+#   python -m fashion.export export --out models/keypoint_rcnn_int8.ts [--no-quantize]
+#   python -m fashion.export verify --model models/keypoint_rcnn_int8.ts --images img --tolerance 4
+# The verify command exits non-zero when any keypoint drifts past the tolerance.
+
+DEFAULT_OUT = os.path.join("models", "keypoint_rcnn_int8.ts")
+DEFAULT_TOLERANCE_PX = 4.0
+TRACE_SHAPE = (800, 1067, 3)
+
+
+def _inference(model, inputs):
+    instances = model.inference(inputs, do_postprocess=False)[0]
+    return [{"instances": instances}]
+
+def export_torchscript(out_path=DEFAULT_OUT, quantize=True, sample_image=None):
+    import torch
+    from detectron2.export import TracingAdapter
+    from fashion.models import build_keypoint_predictor
+    from fashion.pose import resize_shortest_edge
+
+    model = build_keypoint_predictor(device="cpu").model.eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if sample_image is None:
+        sample_image = np.random.default_rng(0).integers(0, 255, TRACE_SHAPE, dtype=np.uint8)
+    resized, _, _ = resize_shortest_edge(sample_image)
+    image = torch.as_tensor(np.ascontiguousarray(resized.transpose(2, 0, 1)), dtype=torch.float32)
+
+    # The adapter is a new module in training mode; freezing needs eval mode
+    adapter = TracingAdapter(model, [{"image": image}], _inference).eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(adapter, (image,), check_trace=False)
+    try:
+        traced = torch.jit.freeze(traced)
+    except Exception as e:
+        # Freezing is an optimisation; save the unfrozen model if the graph refuses it
+        logger.warning("Could not freeze the traced model, saving it unfrozen: %s", e)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    torch.jit.save(traced, out_path)
+    return out_path
+
+# Worst keypoint distance (px) between the exported and float model, per image
+def verify(model_path, image_paths, tolerance=DEFAULT_TOLERANCE_PX, min_score=0.05):
+    from fashion.models import build_keypoint_predictor
+    from fashion.body import detect_keypoints
+    from fashion.pose import TorchScriptBackend
+
+    reference = build_keypoint_predictor(device="cpu")
+    exported = TorchScriptBackend(model_path)
+    failures = 0
+    for path in image_paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        _, ref = detect_keypoints(reference, image)
+        out = exported.detect(image)
+        name = os.path.basename(path)
+        if len(ref) != len(out):
+            print(f"FAIL {name}: {len(out)} people detected, float model found {len(ref)}")
+            failures += 1
+            continue
+        if len(ref) == 0:
+            print(f"ok   {name}: no people in either model")
+            continue
+        visible = ref[..., 2] > min_score
+        drift = np.linalg.norm(out[..., :2] - ref[..., :2], axis=-1)[visible]
+        worst = float(drift.max()) if drift.size else 0.0
+        status = "ok  " if worst <= tolerance else "FAIL"
+        failures += worst > tolerance
+        print(f"{status} {name}: max drift {worst:.2f}px, mean {float(drift.mean()) if drift.size else 0.0:.2f}px")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or verify a TorchScript keypoint model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export")
+    exp.add_argument("--out", default=DEFAULT_OUT)
+    exp.add_argument("--no-quantize", action="store_true", help="keep float32 Linear layers")
+    exp.add_argument("--sample", help="image to trace with (default: random noise)")
+    ver = sub.add_parser("verify")
+    ver.add_argument("--model", default=DEFAULT_OUT)
+    ver.add_argument("--images", default="img")
+    ver.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE_PX, help="max keypoint drift in pixels")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        sample = cv2.imread(args.sample) if args.sample else None
+        print(f"Wrote {export_torchscript(args.out, not args.no_quantize, sample)}")
+    else:
+        paths = sorted(p for ext in ("jpg", "jpeg", "png", "webp") for p in glob.glob(os.path.join(args.images, f"*.{ext}")))
+        failures = verify(args.model, paths, args.tolerance)
+        sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
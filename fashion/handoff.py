@@ -0,0 +1,137 @@
+import os
+import threading
+import uuid
+
+from fashion.metrics import span
+
+# Handoff of uploaded photos from the upload page to the recommendation page.
+# Each session keeps its own uploads in st.session_state keyed by upload ID, so
+# concurrent users never see each other's photo. Set FASHION_HANDOFF_REDIS_URL
+# to also publish uploads to Redis when pages may be served by different workers.
+
+SESSION_KEY = "uploads"
+CURRENT_KEY = "current_upload_id"
+SET_KEY = "current_upload_set"
+# Photos of one person analyzed together (front, side, different lighting)
+MAX_PHOTOS_PER_SET = 4
+MAX_UPLOADS_PER_SESSION = 2 * MAX_PHOTOS_PER_SET
+SHARED_TTL_SECONDS = int(os.environ.get("FASHION_HANDOFF_TTL", "3600"))
+
+
+# Process-wide dict, mainly useful for tests and single-worker setups
+class MemoryBackend:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def put(self, upload_id, data):
+        with self._lock:
+            self._data[upload_id] = data
+
+    def get(self, upload_id):
+        with self._lock:
+            return self._data.get(upload_id)
+
+
+class RedisBackend:
+    def __init__(self, url, ttl=SHARED_TTL_SECONDS, prefix="fashion:upload:"):
+        import redis  # optional dependency, only needed for multi-worker deployments
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+
+    def put(self, upload_id, data):
+        self._client.set(self._prefix + upload_id, data, ex=self._ttl)
+
+    def get(self, upload_id):
+        return self._client.get(self._prefix + upload_id)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_shared_backend():
+    global _backend
+    url = os.environ.get("FASHION_HANDOFF_REDIS_URL")
+    if not url:
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = RedisBackend(url)
+    return _backend
+
+def set_shared_backend(backend):
+    global _backend
+    _backend = backend
+
+def _session_uploads(session_state):
+    if SESSION_KEY not in session_state:
+        session_state[SESSION_KEY] = {}
+    return session_state[SESSION_KEY]
+
+# Add an upload to this session's bounded set, oldest dropped first
+def _remember(session_state, upload_id, data, name=None, preview=None):
+    uploads = _session_uploads(session_state)
+    uploads[upload_id] = {"name": name, "bytes": data, "preview": preview}
+    while len(uploads) > MAX_UPLOADS_PER_SESSION:
+        uploads.pop(next(iter(uploads)))
+
+# Keep the upload's bytes for this session and return its upload ID
+def store_upload(session_state, data, name=None, upload_id=None, preview=None):
+    upload_id = upload_id or uuid.uuid4().hex
+    _remember(session_state, upload_id, data, name, preview)
+    session_state[CURRENT_KEY] = upload_id
+
+    backend = _backend or get_shared_backend()
+    if backend is not None:
+        backend.put(upload_id, data)
+    return upload_id
+
+def current_upload_id(session_state):
+    return session_state.get(CURRENT_KEY)
+
+# Mark uploads as one person's photo set; the first becomes the current upload
+def set_upload_set(session_state, upload_ids):
+    session_state[SET_KEY] = list(upload_ids)
+    if upload_ids:
+        session_state[CURRENT_KEY] = upload_ids[0]
+
+# Upload IDs of the current photo set, or just the current upload if it isn't part of one
+def current_upload_set(session_state):
+    current = current_upload_id(session_state)
+    upload_ids = session_state.get(SET_KEY) or []
+    if current in upload_ids:
+        return list(upload_ids)
+    return [current] if current else []
+
+# Raw bytes for an upload: this session first, then the shared backend
+def load_upload(session_state, upload_id=None):
+    upload_id = upload_id or current_upload_id(session_state)
+    if upload_id is None:
+        return None
+    entry = _session_uploads(session_state).get(upload_id)
+    if entry is not None:
+        return entry["bytes"]
+    backend = _backend or get_shared_backend()
+    if backend is None:
+        return None
+    data = backend.get(upload_id)
+    if data is not None:
+        # Only cache it here: the current upload stays as it is and the shared copy isn't rewritten
+        _remember(session_state, upload_id, data)
+    return data
+
+# Small JPEG for display if the upload page made one, else the full bytes
+def load_preview(session_state, upload_id=None):
+    upload_id = upload_id or current_upload_id(session_state)
+    data = load_upload(session_state, upload_id)
+    if data is None:
+        return None
+    return _session_uploads(session_state)[upload_id]["preview"] or data
+
+@span("image.decode")
+def decode_image(data):
+    import numpy as np
+    import cv2
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
@@ -0,0 +1,119 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from fashion import metrics
+from fashion.metrics import span
+
+# Micro-batching front end for the keypoint model. Callers from any session or
+# batch job submit single images; worker threads gather up to MAX_BATCH_SIZE of
+# them (waiting at most MAX_WAIT_MS after the first) and run one forward pass
+# per batch on a predictor borrowed from the shared pool.
+
+MAX_BATCH_SIZE = int(os.environ.get("FASHION_MAX_BATCH_SIZE", "4"))
+MAX_WAIT_MS = float(os.environ.get("FASHION_MAX_BATCH_WAIT_MS", "15"))
+LATENCY_WINDOW = 1000
+BATCH_SIZE_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32)
+
+metrics.histogram("keypoint_batch_size", "Images per keypoint model forward pass.", BATCH_SIZE_BUCKETS)
+metrics.histogram("keypoint_latency_seconds", "Time from submit to keypoints for one image, queueing included.")
+
+
+class KeypointBatcher:
+    def __init__(self, pool, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, workers=None):
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._max_queue_depth = 0
+        self._images = 0
+        for i in range(workers or pool.size):
+            threading.Thread(target=self._worker, name=f"keypoint-batcher-{i}", daemon=True).start()
+
+    # Future resolving to the (N, 17, 3) pred_keypoints array for this image
+    def submit(self, image):
+        future = Future()
+        self._queue.put((image, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+        return future
+
+    def detect(self, image, timeout=None):
+        return self.submit(image).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        from fashion.models import predict_batch
+        while True:
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                with self.pool.acquire() as predictor, span("pose.inference"):
+                    outputs = predict_batch(predictor, [image for image, _, _ in batch])
+                results = [out["instances"].pred_keypoints.cpu().numpy() for out in outputs]
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            latencies = [done - submitted for _, _, submitted in batch]
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._images += len(batch)
+                self._latencies.extend(latencies)
+            metrics.observe_value("keypoint_batch_size", len(batch))
+            for latency in latencies:
+                metrics.observe_value("keypoint_latency_seconds", latency)
+            for (_, future, _), keypoints in zip(batch, results):
+                future.set_result(keypoints)
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "images": self._images,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "latency_p50_seconds": float(np.percentile(latencies, 50)),
+                "latency_p95_seconds": float(np.percentile(latencies, 95)),
+                "latency_max_seconds": float(latencies.max()),
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_keypoint_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from fashion.models import get_predictor_pool
+                _service = KeypointBatcher(get_predictor_pool())
+                metrics.register_collector("keypoint_batcher", _service.stats, {
+                    "queue_depth": ("queue_depth", "gauge", "Images waiting for a keypoint batch."),
+                    "max_queue_depth": ("max_queue_depth", "gauge", "Deepest the keypoint queue has been."),
+                    "images": ("images_total", "counter", "Images run through the keypoint model."),
+                })
+    return _service
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# Single decode of an uploaded photo into the normalized artifact both pages use:
+# EXIF-rotated RGB, longest side capped, re-encoded under a byte budget, plus a preview.
+
+MAX_UPLOAD_BYTES = int(os.environ.get("FASHION_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+# Refuse decompression bombs well before they reach the analysis code
+MAX_UPLOAD_PIXELS = int(os.environ.get("FASHION_MAX_UPLOAD_PIXELS", "64000000"))
+MAX_SIDE = int(os.environ.get("FASHION_STORED_MAX_SIDE", "2048"))
+MAX_STORED_BYTES = int(os.environ.get("FASHION_MAX_STORED_BYTES", str(1536 * 1024)))
+PREVIEW_SIDE = 768
+STORED_FORMAT = os.environ.get("FASHION_STORED_FORMAT", "JPEG").upper()
+QUALITY_STEPS = (90, 82, 74, 66, 58, 50)
+# Pillow releases the GIL while decoding, resizing and encoding, so threads overlap well
+INGEST_WORKERS = int(os.environ.get("FASHION_INGEST_WORKERS", "4"))
+
+IngestedImage = namedtuple("IngestedImage", "data preview width height format extension")
+
+EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+
+
+def _encode(image, fmt, quality):
+    buf = BytesIO()
+    image.save(buf, format=fmt, quality=quality, optimize=fmt == "JPEG")
+    return buf.getvalue()
+
+# Encode at the highest quality step that fits max_bytes (last step if none does)
+def encode_within(image, fmt=STORED_FORMAT, max_bytes=MAX_STORED_BYTES):
+    data = None
+    for quality in QUALITY_STEPS:
+        data = _encode(image, fmt, quality)
+        if len(data) <= max_bytes:
+            break
+    return data
+
+def ingest_upload(data, max_side=MAX_SIDE, max_bytes=MAX_STORED_BYTES, fmt=STORED_FORMAT):
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError(f"File is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Unsupported storage format: {fmt}")
+
+    image = Image.open(BytesIO(data))  # reads the header only; pixels are decoded below
+    if image.width * image.height > MAX_UPLOAD_PIXELS:
+        raise ValueError(f"Image is larger than {MAX_UPLOAD_PIXELS // 1_000_000} megapixels")
+    # Already normalized (right format, upright, small enough): keep the bytes as they are
+    keep_original = (image.format == fmt and image.mode == "RGB" and len(data) <= max_bytes
+                     and max(image.size) <= max_side and image.getexif().get(0x0112, 1) == 1)
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    stored = data if keep_original else encode_within(image, fmt, max_bytes)
+
+    preview = image.copy()
+    preview.thumbnail((PREVIEW_SIDE, PREVIEW_SIDE), Image.LANCZOS)
+    preview_data = _encode(preview, "JPEG", 80)
+
+    return IngestedImage(stored, preview_data, image.width, image.height, fmt, EXTENSIONS[fmt])
+
+
+_executor = None
+_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+    return _executor
+
+def _timed_ingest(data, kwargs):
+    start = time.perf_counter()
+    try:
+        return ingest_upload(data, **kwargs), None, time.perf_counter() - start
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+# Ingest several uploads in parallel. Yields (index, IngestedImage or None, error or
+# None, seconds) in completion order, so callers can act on the first photo ready.
+def ingest_many(datas, **kwargs):
+    executor = _get_executor()
+    futures = {executor.submit(_timed_ingest, data, kwargs): i for i, data in enumerate(datas)}
+    for future in as_completed(futures):
+        ingested, error, seconds = future.result()
+        yield futures[future], ingested, error, seconds
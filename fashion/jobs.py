@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from fashion import metrics
+
+logger = logging.getLogger(__name__)
+
+# Background analysis jobs. A job is a small DAG of named stages run on a shared
+# worker pool; each stage starts as soon as its dependencies have finished, and
+# pages poll the job to render stage results as they land. Jobs are keyed (by
+# image hash), so identical in-flight requests share one job. A job nobody has
+# polled for ABANDON_SECONDS is cancelled before its next stage starts.
+
+MAX_WORKERS = int(os.environ.get("FASHION_JOB_WORKERS", "4"))
+ABANDON_SECONDS = float(os.environ.get("FASHION_JOB_ABANDON_SECONDS", "30"))
+FINISHED_JOBS_KEPT = 64
+
+# fn receives the job's results dict (inputs plus finished stages) and returns this stage's result.
+# Optional deps are waited for like deps, but the stage still runs (without them) if they fail.
+Stage = namedtuple("Stage", "name deps fn optional", defaults=((),))
+
+
+class JobCancelled(Exception):
+    pass
+
+# Final stages (nothing depends on them) not already in inputs, plus what they need
+def _needed_stages(stages, inputs):
+    depended_on = {dep for stage in stages.values() for dep in stage.deps + stage.optional}
+    needed = set()
+    stack = [name for name in stages if name not in depended_on]
+    while stack:
+        name = stack.pop()
+        if name in needed or name in inputs:
+            continue
+        needed.add(name)
+        stack.extend(stages[name].deps + stages[name].optional)
+    return {name: stage for name, stage in stages.items() if name in needed}
+
+
+class Job:
+    def __init__(self, key, stages, inputs, on_complete=None, discard=()):
+        self.key = key
+        self.stages = _needed_stages({stage.name: stage for stage in stages}, inputs)
+        self.results = dict(inputs)
+        self.errors = {}
+        self.spans = {}  # stage -> (start, end) seconds since the job was created
+        self.trace = []  # (span, start perf_counter, seconds) for every metrics.span run by a stage
+        self.on_complete = on_complete
+        self.discard = discard
+        self.cancelled = False
+        self.created = self.last_seen = time.monotonic()
+        self._t0 = time.perf_counter()
+        self._started = set()
+        self._skipped = set()
+        self._completed = False
+        self._cond = threading.Condition()
+        self._version = 0
+
+    @property
+    def done(self):
+        return self._completed or self.cancelled or all(name in self.results or name in self.errors for name in self.stages)
+
+    # No stage of this job is still running (a cancelled job can be done before it settles)
+    @property
+    def settled(self):
+        with self._cond:
+            return all(name in self.results or name in self.errors for name in self._started)
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def cancel(self):
+        with self._cond:
+            self.cancelled = True
+            self._version += 1
+            self._cond.notify_all()
+
+    # (results, errors, done) copies; also counts as the job being watched
+    def snapshot(self):
+        self.touch()
+        with self._cond:
+            return dict(self.results), dict(self.errors), self.done
+
+    # Block until something changes or timeout; returns False on timeout
+    def wait(self, timeout=None, since=None):
+        self.touch()
+        with self._cond:
+            version = self._version if since is None else since
+            return self._cond.wait_for(lambda: self._version != version or self.done, timeout)
+
+    def _ready(self):
+        ready = []
+        for name, stage in self.stages.items():
+            if name in self._started or name in self.results or name in self.errors:
+                continue
+            failed = [dep for dep in stage.deps if dep in self.errors]
+            if failed:
+                # Report the root cause, not a chain of "skipped" stages
+                dep = failed[0]
+                self.errors[name] = self.errors[dep] if dep in self._skipped else f"{dep} failed: {self.errors[dep]}"
+                self._skipped.add(name)
+            elif (all(dep in self.results for dep in stage.deps)
+                  and all(dep in self.results or dep in self.errors for dep in stage.optional)):
+                self._started.add(name)
+                ready.append(stage)
+        return ready
+
+    # Stage durations (seconds) in the order they finished
+    @property
+    def timings(self):
+        return {name: end - start for name, (start, end) in self.spans.items()}
+
+    # [(stage, seconds)] along the dependency chain that ended last: the stages that set
+    # the job's wall time. Stages off this path ran concurrently and cost nothing extra.
+    def critical_path(self):
+        with self._cond:
+            spans = dict(self.spans)
+        name = max(spans, key=lambda n: spans[n][1], default=None)
+        path = []
+        while name is not None:
+            path.append((name, spans[name][1] - spans[name][0]))
+            deps = [d for d in self.stages[name].deps + self.stages[name].optional if d in spans]
+            name = max(deps, key=lambda d: spans[d][1], default=None)
+        return path[::-1]
+
+    def timing_report(self):
+        with self._cond:
+            spans = dict(self.spans)
+        if not spans:
+            return {"wall_seconds": 0.0, "stage_seconds": 0.0, "critical_path": []}
+        return {
+            "wall_seconds": max(end for _, end in spans.values()) - min(start for start, _ in spans.values()),
+            "stage_seconds": sum(end - start for start, end in spans.values()),
+            "critical_path": self.critical_path(),
+        }
+
+    # [(span, start, seconds)] of the sub-stage spans, start in seconds since the job was created
+    def trace_spans(self):
+        spans = [(name, start - self._t0, seconds) for name, start, seconds in list(self.trace)]
+        return sorted(spans, key=lambda span: span[1])
+
+    def _finish(self, name, result=None, error=None, start=None):
+        end = time.perf_counter() - self._t0
+        with self._cond:
+            if error is None:
+                self.results[name] = result
+            else:
+                self.errors[name] = error
+            if start is not None:
+                self.spans[name] = (start, end)
+            self._version += 1
+            ready = [] if self.cancelled else self._ready()
+            self._cond.notify_all()
+        return ready
+
+
+class JobRunner:
+    def __init__(self, max_workers=MAX_WORKERS, abandon_seconds=ABANDON_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self.abandon_seconds = abandon_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    # The in-flight job for key if there is one, otherwise a new job started now.
+    # Results named in `discard` (bulky inputs and intermediates) are dropped once it finishes.
+    def submit(self, key, stages, inputs, on_complete=None, discard=()):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.done:
+                job.touch()
+                return job
+            job = Job(key, stages, inputs, on_complete, discard)
+            self._jobs[key] = job
+            self._prune()
+        with job._cond:
+            ready = job._ready()
+        self._schedule(job, ready)
+        if not ready and job.done:
+            self._complete(job)
+        return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _prune(self):
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for key in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[key]
+
+    def _schedule(self, job, stages):
+        for stage in stages:
+            self._executor.submit(self._run_stage, job, stage)
+
+    def _run_stage(self, job, stage):
+        if not job.cancelled and time.monotonic() - job.last_seen > self.abandon_seconds:
+            logger.info("Cancelling abandoned job %s", job.key)
+            job.cancel()
+        start = time.perf_counter() - job._t0
+        try:
+            if job.cancelled:
+                raise JobCancelled()
+            with job._cond:
+                inputs = dict(job.results)
+            with metrics.collect(job.trace), metrics.span(f"analysis.{stage.name}"):
+                result = stage.fn(inputs)
+            ready = job._finish(stage.name, result=result, start=start)
+        except JobCancelled:
+            ready = job._finish(stage.name, error="cancelled")
+        except Exception as e:
+            logger.exception("Stage %s of job %s failed", stage.name, job.key)
+            ready = job._finish(stage.name, error=f"{type(e).__name__}: {e}", start=start)
+        self._schedule(job, ready)
+        # Cancelled jobs complete too, once their running stages finish, so results
+        # they already have are cached and their discarded inputs are dropped
+        if job.done and job.settled:
+            self._complete(job)
+
+    def _complete(self, job):
+        with job._cond:
+            if job._completed:
+                return
+            job._completed = True
+        report = job.timing_report()
+        logger.info("Job %s: %.0f ms wall, %.0f ms of stage work, critical path %s", job.key,
+                    report["wall_seconds"] * 1000, report["stage_seconds"] * 1000,
+                    " -> ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in report["critical_path"]))
+        if job.on_complete is not None:
+            try:
+                job.on_complete(job)
+            except Exception:
+                logger.exception("Completion callback for job %s failed", job.key)
+        # Finished jobs are kept for FINISHED_JOBS_KEPT rejoins; don't keep their photos too
+        with job._cond:
+            for name in job.discard:
+                job.results.pop(name, None)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_job_runner():
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner()
+    return _runner
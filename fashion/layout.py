@@ -0,0 +1,73 @@
+import os
+import re
+import json
+from functools import lru_cache
+
+import streamlit as st
+from streamlit.components.v1 import html
+
+# Shared page chrome for the styled pages: stylesheet, nav bar and the Watson
+# Assistant chat. Fragments are built once per process; Streamlit re-sends
+# every element on each rerun, so what is sent is kept as small as possible.
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+WATSON_CHAT = {
+    "integrationID": "f42d8c8b-7fbf-472b-8522-443e0956d529",
+    "region": "au-syd",
+    "serviceInstanceID": "092e368d-f783-43c6-9a54-68b689045e9b",
+}
+WATSON_ENTRY = "https://web-chat.global.assistant.watson.appdomain.cloud/versions/latest/WatsonAssistantChatEntry.js"
+
+CURRENT_LINK_STYLE = ' style="font-weight:bold;"'
+NAV_LINKS = (
+    ("home", "app.py", "Home"),
+    ("collection", "collection.py", "Collections"),
+    ("about", "about.py", "About Us"),
+    ("contact", "contact.py", "Contact"),
+)
+
+# Comments and layout whitespace dropped; declarations and their order untouched
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css)
+    return re.sub(r"([:,]) ", r"\1", css).strip()
+
+# <style> block for a stylesheet in fashion/static (home, upload)
+@lru_cache(maxsize=None)
+def style_block(name):
+    with open(os.path.join(STATIC_DIR, f"{name}.css")) as f:
+        return f"<style>{minify_css(f.read())}</style>"
+
+def inject_css(name):
+    st.markdown(style_block(name), unsafe_allow_html=True)
+
+@lru_cache(maxsize=None)
+def get_nav_links(current_page):
+    items = "".join(
+        f'<li><a href="{href}"{CURRENT_LINK_STYLE if page == current_page else ""}>{label}</a></li>'
+        for page, href, label in NAV_LINKS
+    )
+    return f"<nav><ul>{items}</ul></nav>"
+
+# Loader for the chat widget. It runs in the component's iframe but installs the
+# widget into the app's own document, once per browser tab: later reruns and page
+# switches find it already there instead of reloading the chat script.
+@lru_cache(maxsize=None)
+def watson_chat():
+    options = json.dumps(WATSON_CHAT)
+    setup = (
+        "(function(){var c=document.createElement('div');c.id='watson-chat-container';document.body.appendChild(c);"
+        f"window.watsonAssistantChatOptions=Object.assign({options},"
+        "{onLoad:function(i){i.render({target:c,serviceInstanceID:window.watsonAssistantChatOptions.serviceInstanceID})}});"
+        f"var t=document.createElement('script');t.src={json.dumps(WATSON_ENTRY)};document.head.appendChild(t)}})()"
+    )
+    return (
+        "<script>(function(){var w;try{w=window.parent;w.document}catch(e){w=window}"
+        "if(w.__watsonChatLoaded)return;w.__watsonChatLoaded=true;"
+        f"var s=w.document.createElement('script');s.text={json.dumps(setup)};w.document.head.appendChild(s)}})()</script>"
+    )
+
+def inject_chat():
+    html(watson_chat(), height=0, width=0)
@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# In-process stage timings. Wrap work in span("stage.name") (a context manager
+# that also works as a decorator); durations land in a per-stage histogram,
+# exported in Prometheus text format on FASHION_METRICS_PORT (/metrics) and/or
+# rewritten every FASHION_METRICS_FILE_INTERVAL seconds to FASHION_METRICS_FILE.
+# A span costs two perf_counter() calls and one short lock, so it stays on in
+# production; FASHION_METRICS=0 turns recording off.
+# Other distributions (e.g. keypoint batch sizes) go in named histograms via
+# observe_value(), and state a module already keeps is read at scrape time
+# through register_collector().
+
+ENABLED = os.environ.get("FASHION_METRICS", "1") != "0"
+METRICS_PORT = int(os.environ.get("FASHION_METRICS_PORT", "0"))
+METRICS_FILE = os.environ.get("FASHION_METRICS_FILE")
+METRICS_FILE_INTERVAL = float(os.environ.get("FASHION_METRICS_FILE_INTERVAL", "15"))
+# Upper bounds in seconds, from colour-table lookups to cold model loads
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.errors += error
+
+
+_histograms = {}
+_named = {}  # name -> (help, Histogram), see histogram()
+_collectors = {}  # name -> (stats function, {stats key: (metric, type, help)})
+_lock = threading.Lock()
+# Per-request list of (stage, start perf_counter, seconds); see collect()
+_trace = ContextVar("fashion_trace", default=None)
+
+def observe(stage, seconds, error=False, start=None):
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = Histogram()
+        histogram.observe(seconds, error)
+    trace = _trace.get()
+    if trace is not None:
+        trace.append((stage, start, seconds))
+
+@contextmanager
+def span(stage):
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start, error, start)
+
+# Also append every span finished in this thread (and context) to `trace`, for the
+# per-request timing panel. Work handed to other threads is only in the histograms.
+@contextmanager
+def collect(trace):
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+# {stage: {"count", "sum", "errors", "buckets": [(le, cumulative count)]}}
+def snapshot():
+    with _lock:
+        copies = {stage: (list(h.counts), h.sum, h.count, h.errors, h.buckets) for stage, h in _histograms.items()}
+    result = {}
+    for stage, (counts, total, count, errors, buckets) in sorted(copies.items()):
+        cumulative, running = [], 0
+        for le, n in zip(buckets + (float("inf"),), counts):
+            running += n
+            cumulative.append((le, running))
+        result[stage] = {"count": count, "sum": total, "errors": errors, "buckets": cumulative}
+    return result
+
+# Declare the histogram fashion_<name>; observe_value() adds to it
+def histogram(name, help, buckets=BUCKETS):
+    with _lock:
+        if name not in _named:
+            _named[name] = (help, Histogram(buckets))
+
+def observe_value(name, value):
+    if not ENABLED:
+        return
+    with _lock:
+        _named[name][1].observe(value)
+
+# Export numbers from stats() at every scrape as fashion_<name>_<metric>. `fields` maps
+# stats keys to (metric, "gauge" or "counter", help); other keys and None values are skipped.
+def register_collector(name, stats, fields):
+    with _lock:
+        _collectors[name] = (stats, fields)
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        for name, (help, h) in list(_named.items()):
+            _named[name] = (help, Histogram(h.buckets))
+
+def _format_le(le):
+    return "+Inf" if le == float("inf") else repr(float(le))
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def _collector_lines():
+    with _lock:
+        collectors = sorted(_collectors.items())
+    lines = []
+    for name, (stats, fields) in collectors:
+        try:
+            values = stats()
+        except Exception:
+            logger.exception("Metrics collector %s failed", name)
+            continue
+        for key, (metric, kind, help) in fields.items():
+            if values.get(key) is None:
+                continue
+            lines += [f"# HELP fashion_{name}_{metric} {help}", f"# TYPE fashion_{name}_{metric} {kind}",
+                      f"fashion_{name}_{metric} {_format_value(values[key])}"]
+    return lines
+
+def render_prometheus():
+    stats = snapshot()
+    lines = ["# HELP fashion_stage_seconds Time spent in each analysis stage.",
+             "# TYPE fashion_stage_seconds histogram"]
+    for stage, s in stats.items():
+        for le, n in s["buckets"]:
+            lines.append(f'fashion_stage_seconds_bucket{{stage="{stage}",le="{_format_le(le)}"}} {n}')
+        lines.append(f'fashion_stage_seconds_sum{{stage="{stage}"}} {s["sum"]:.6f}')
+        lines.append(f'fashion_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+    lines += ["# HELP fashion_stage_errors_total Stage runs that raised.",
+              "# TYPE fashion_stage_errors_total counter"]
+    for stage, s in stats.items():
+        lines.append(f'fashion_stage_errors_total{{stage="{stage}"}} {s["errors"]}')
+    with _lock:
+        named = [(name, help, h.buckets, list(h.counts), h.sum, h.count) for name, (help, h) in sorted(_named.items())]
+    for name, help, buckets, counts, total, count in named:
+        lines += [f"# HELP fashion_{name} {help}", f"# TYPE fashion_{name} histogram"]
+        running = 0
+        for le, n in zip(buckets + (float("inf"),), counts):
+            running += n
+            lines.append(f'fashion_{name}_bucket{{le="{_format_le(le)}"}} {running}')
+        lines.append(f"fashion_{name}_sum {total:.6f}")
+        lines.append(f"fashion_{name}_count {count}")
+    lines += _collector_lines()
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def _write_loop(path, interval):
+    while True:
+        try:
+            write_prometheus(path)
+        except OSError:
+            logger.exception("Could not write metrics to %s", path)
+        time.sleep(interval)
+
+# Start the /metrics server and/or file writer once per process (no-op if neither is configured)
+def start_exporter(port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_FILE_INTERVAL):
+    global _exporter_started
+    if not ENABLED or not (port or path):
+        return False
+    with _exporter_lock:
+        if _exporter_started:
+            return False
+        _exporter_started = True
+    if port:
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError:
+            logger.exception("Could not serve metrics on port %d", port)
+        else:
+            threading.Thread(target=server.serve_forever, name="fashion-metrics", daemon=True).start()
+            logger.info("Serving metrics on :%d/metrics", port)
+    if path:
+        threading.Thread(target=_write_loop, args=(path, interval), name="fashion-metrics-file", daemon=True).start()
+    return True
@@ -0,0 +1,126 @@
+import os
+import queue
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+from detectron2.engine import DefaultPredictor
+from detectron2.config import get_cfg
+from detectron2 import model_zoo
+
+from fashion import metrics
+from fashion.metrics import span
+from fashion.torch_config import configure_torch_threads
+
+logger = logging.getLogger(__name__)
+
+KEYPOINT_CONFIG = "COCO-Keypoints/keypoint_rcnn_R_50_FPN_3x.yaml"
+POOL_SIZE = int(os.environ.get("FASHION_PREDICTOR_POOL_SIZE", "2"))
+WARMUP_SHAPE = (480, 640, 3)
+
+# Build a fresh Detectron2 keypoint predictor (config merge + weight load)
+def build_keypoint_predictor(device=None):
+    configure_torch_threads()
+    cfg = get_cfg()
+    cfg.merge_from_file(model_zoo.get_config_file(KEYPOINT_CONFIG))
+    cfg.MODEL.ROI_HEADS.SCORE_THRESH_TEST = 0.5
+    cfg.MODEL.WEIGHTS = model_zoo.get_checkpoint_url(KEYPOINT_CONFIG)
+    cfg.MODEL.DEVICE = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    return DefaultPredictor(cfg)
+
+# Run one dummy inference so the first real request doesn't pay for lazy init
+def warm_up(predictor):
+    predictor(np.zeros(WARMUP_SHAPE, dtype=np.uint8))
+
+
+# Same preprocessing as DefaultPredictor.__call__, but one forward pass for a list of BGR images
+def predict_batch(predictor, images):
+    inputs = []
+    with torch.no_grad():
+        for image in images:
+            if predictor.input_format == "RGB":
+                image = image[:, :, ::-1]
+            height, width = image.shape[:2]
+            tensor = predictor.aug.get_transform(image).apply_image(image)
+            tensor = torch.as_tensor(tensor.astype("float32").transpose(2, 0, 1))
+            inputs.append({"image": tensor.to(predictor.cfg.MODEL.DEVICE), "height": height, "width": width})
+        return predictor.model(inputs)
+
+
+# Fixed set of predictors, each handed out to one caller at a time
+class PredictorPool:
+    def __init__(self, size=POOL_SIZE, factory=build_keypoint_predictor):
+        self.size = max(1, size)
+        self._free = queue.Queue()
+        self._lock = threading.Lock()
+        self._acquisitions = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        start = time.perf_counter()
+        with span("pose.model_load"):
+            for _ in range(self.size):
+                self._free.put(factory())
+        self.load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with span("pose.warmup"):
+            for predictor in list(self._free.queue):
+                warm_up(predictor)
+        self.warmup_seconds = time.perf_counter() - start
+
+        logger.info("Loaded %d keypoint predictor(s) in %.2fs, warm-up %.2fs",
+                    self.size, self.load_seconds, self.warmup_seconds)
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        start = time.perf_counter()
+        predictor = self._free.get(timeout=timeout)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._acquisitions += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        try:
+            yield predictor
+        finally:
+            self._free.put(predictor)
+
+    def stats(self):
+        with self._lock:
+            acquisitions = self._acquisitions
+            return {
+                "pool_size": self.size,
+                "in_use": self.size - self._free.qsize(),
+                "load_seconds": self.load_seconds,
+                "warmup_seconds": self.warmup_seconds,
+                "acquisitions": acquisitions,
+                "total_wait_seconds": self._total_wait,
+                "mean_wait_seconds": self._total_wait / acquisitions if acquisitions else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Process-wide pool, built (and warmed up) by whichever caller gets here first
+def get_predictor_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PredictorPool()
+                metrics.register_collector("predictor_pool", _pool.stats, {
+                    "pool_size": ("size", "gauge", "Keypoint predictors in the pool."),
+                    "in_use": ("in_use", "gauge", "Predictors currently lent out."),
+                    "load_seconds": ("load_seconds", "gauge", "Time taken to load the pool's models."),
+                    "warmup_seconds": ("warmup_seconds", "gauge", "Time taken by the warm-up inferences."),
+                    "acquisitions": ("acquisitions_total", "counter", "Predictors handed out."),
+                    "total_wait_seconds": ("wait_seconds_total", "counter", "Time callers spent waiting for a predictor."),
+                    "max_wait_seconds": ("max_wait_seconds", "gauge", "Longest wait for a predictor."),
+                })
+    return _pool
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+
+from fashion.metrics import span
+
+# Concurrent download of outfit inspiration images through one pooled session.
+# The whole batch shares a deadline; each image is size-capped and shrunk to a
+# thumbnail before it reaches st.image.
+
+DEADLINE_SECONDS = float(os.environ.get("FASHION_OUTFIT_DEADLINE", "6"))
+CONNECT_TIMEOUT = 2.0
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+THUMBNAIL_SIDE = 480
+MAX_WORKERS = 8
+CHUNK_SIZE = 64 * 1024
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+def get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = "Mozilla/5.0 (LuxeVogue outfit preview)"
+                _session = session
+    return _session
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="outfit-fetch")
+    return _executor
+
+# JPEG thumbnail bytes, or None if the image is too big, too slow or not decodable
+@span("search.image")
+def fetch_thumbnail(url, deadline, max_bytes=MAX_IMAGE_BYTES, side=THUMBNAIL_SIDE):
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    try:
+        with get_session().get(url, stream=True, timeout=(min(CONNECT_TIMEOUT, remaining), remaining)) as resp:
+            resp.raise_for_status()
+            if int(resp.headers.get("Content-Length") or 0) > max_bytes:
+                return None
+            buf = bytearray()
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                buf.extend(chunk)
+                if len(buf) > max_bytes or time.monotonic() > deadline:
+                    return None
+        image = Image.open(BytesIO(bytes(buf)))
+        image.thumbnail((side, side))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        out = BytesIO()
+        image.save(out, format="JPEG", quality=85)
+        return out.getvalue()
+    except Exception:
+        return None
+
+# Thumbnails in the same order as urls; entries that missed the deadline or failed are None
+def fetch_outfit_images(urls, deadline_seconds=DEADLINE_SECONDS, max_bytes=MAX_IMAGE_BYTES, side=THUMBNAIL_SIDE):
+    deadline = time.monotonic() + deadline_seconds
+    executor = _get_executor()
+    futures = [executor.submit(fetch_thumbnail, url, deadline, max_bytes, side) for url in urls]
+    wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    return [f.result() if f.done() else None for f in futures]
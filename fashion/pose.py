@@ -0,0 +1,137 @@
+import os
+import threading
+
+import numpy as np
+import cv2
+
+from fashion.metrics import span
+
+# Pose backends return COCO-17 keypoints as an (N, 17, 3) float array of
+# (x, y, score) in the input image's pixel coordinates, one row per person,
+# which is all extract_measurements needs. Pick one with FASHION_POSE_BACKEND:
+#   detectron2  keypoint R-CNN R50-FPN through the micro-batching service (default)
+#   movenet     MoveNet SinglePose exported to ONNX (FASHION_MOVENET_MODEL), CPU-friendly
+#   torchscript keypoint R-CNN traced (and int8-quantized) by `python -m fashion.export`
+#               (FASHION_TORCHSCRIPT_MODEL); needs torch but not detectron2 at runtime
+
+DEFAULT_BACKEND = os.environ.get("FASHION_POSE_BACKEND", "detectron2")
+MOVENET_MODEL = os.environ.get("FASHION_MOVENET_MODEL", os.path.join("models", "movenet_singlepose_lightning.onnx"))
+TORCHSCRIPT_MODEL = os.environ.get("FASHION_TORCHSCRIPT_MODEL", os.path.join("models", "keypoint_rcnn_int8.ts"))
+# Test-time resize of the keypoint R-CNN config (INPUT.MIN_SIZE_TEST/MAX_SIZE_TEST);
+# exported models are fed the same way
+RCNN_MIN_SIZE = 800
+RCNN_MAX_SIZE = 1333
+
+
+class PoseBackend:
+    name = None
+
+    def detect(self, image):
+        raise NotImplementedError
+
+    def detect_batch(self, images):
+        return [self.detect(image) for image in images]
+
+
+class Detectron2Backend(PoseBackend):
+    name = "detectron2"
+
+    def detect(self, image):
+        from fashion.inference import get_keypoint_service
+        return get_keypoint_service().detect(image)
+
+    # Offline callers already hold a batch, so skip the service queue
+    def detect_batch(self, images):
+        from fashion.models import get_predictor_pool, predict_batch
+        with get_predictor_pool().acquire() as predictor, span("pose.inference"):
+            outputs = predict_batch(predictor, images)
+        return [out["instances"].pred_keypoints.cpu().numpy() for out in outputs]
+
+
+# Single-person MoveNet (Lightning 192 px or Thunder 256 px) via ONNX Runtime
+class MoveNetBackend(PoseBackend):
+    name = "movenet"
+
+    def __init__(self, model_path=MOVENET_MODEL, min_score=0.0):
+        import onnxruntime as ort  # optional dependency, only for this backend
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"MoveNet model not found at {model_path}")
+        self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_size = model_input.shape[1] if isinstance(model_input.shape[1], int) else 192
+        self.input_dtype = np.int32 if "int32" in model_input.type else np.float32
+        self.min_score = min_score
+
+    @span("pose.inference")
+    def detect(self, image):
+        # Pad to a square on the bottom/right so the output maps back with one scale
+        h, w = image.shape[:2]
+        side = max(h, w)
+        square = cv2.copyMakeBorder(image, 0, side - h, 0, side - w, cv2.BORDER_CONSTANT, value=0)
+        resized = cv2.resize(square, (self.input_size, self.input_size), interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)[np.newaxis].astype(self.input_dtype)
+        output = self.session.run(None, {self.input_name: rgb})[0].reshape(17, 3)  # (y, x, score), normalized
+        if output[:, 2].mean() < self.min_score:
+            return np.zeros((0, 17, 3), dtype=np.float32)
+        keypoints = np.stack([output[:, 1] * side, output[:, 0] * side, output[:, 2]], axis=1)
+        return keypoints[np.newaxis].astype(np.float32)
+
+
+# Shortest-edge resize used by Detectron2 at test time; returns (image, x_scale, y_scale)
+def resize_shortest_edge(image, min_size=RCNN_MIN_SIZE, max_size=RCNN_MAX_SIZE):
+    h, w = image.shape[:2]
+    scale = min(min_size / min(h, w), max_size / max(h, w))
+    new_w, new_h = int(w * scale + 0.5), int(h * scale + 0.5)
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return resized, new_w / w, new_h / h
+
+
+# Keypoint R-CNN traced by fashion.export; outputs are in resized-input coordinates
+class TorchScriptBackend(PoseBackend):
+    name = "torchscript"
+
+    def __init__(self, model_path=TORCHSCRIPT_MODEL):
+        import torch
+        import torchvision  # noqa: F401  registers the nms/roi_align ops the traced graph calls
+        from fashion.torch_config import configure_torch_threads
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"TorchScript model not found at {model_path}; run python -m fashion.export")
+        configure_torch_threads()
+        self.torch = torch
+        self.model = torch.jit.load(model_path, map_location="cpu").eval()
+
+    @span("pose.inference")
+    def detect(self, image):
+        resized, sx, sy = resize_shortest_edge(image)
+        tensor = self.torch.as_tensor(np.ascontiguousarray(resized.transpose(2, 0, 1)), dtype=self.torch.float32)
+        with self.torch.no_grad():
+            outputs = self.model(tensor)
+        keypoints = next((o for o in outputs if o.dim() == 3 and tuple(o.shape[1:]) == (17, 3)), None)
+        if keypoints is None:
+            return np.zeros((0, 17, 3), dtype=np.float32)
+        keypoints = keypoints.cpu().numpy().astype(np.float32)
+        keypoints[..., 0] /= sx
+        keypoints[..., 1] /= sy
+        return keypoints
+
+
+BACKENDS = {
+    Detectron2Backend.name: Detectron2Backend,
+    MoveNetBackend.name: MoveNetBackend,
+    TorchScriptBackend.name: TorchScriptBackend,
+}
+
+_backends = {}
+_lock = threading.Lock()
+
+def get_pose_backend(name=None):
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pose backend: {name} (choose from {', '.join(BACKENDS)})")
+    if name not in _backends:
+        with _lock:
+            if name not in _backends:
+                with span("pose.model_load"):
+                    _backends[name] = BACKENDS[name]()
+    return _backends[name]
@@ -0,0 +1,37 @@
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Warm the analysis backend in a daemon thread so the first visit to the
+# recommendations page doesn't pay for importing torch and detectron2.
+# The pose model is loaded and warmed up too, so the first analysis doesn't
+# wait for it; FASHION_PRELOAD_MODEL=0 leaves that to the first request.
+# FASHION_PRELOAD=0 disables preloading altogether.
+
+_started = False
+_lock = threading.Lock()
+
+def _run(load_model):
+    start = time.perf_counter()
+    try:
+        from fashion import backend
+        backend.preload(load_model=load_model)
+    except Exception:
+        logger.exception("Background preload failed")
+        return
+    logger.info("Analysis backend preloaded in %.2fs", time.perf_counter() - start)
+
+def start_background_preload():
+    global _started
+    if os.environ.get("FASHION_PRELOAD", "1") == "0":
+        return False
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    load_model = os.environ.get("FASHION_PRELOAD_MODEL", "1") != "0"
+    threading.Thread(target=_run, args=(load_model,), name="fashion-preload", daemon=True).start()
+    return True
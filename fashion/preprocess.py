@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+import cv2
+
+# Longest side (px) each analysis path works at; 0 disables downsampling.
+# Detectron2 resizes to at most 1333 px internally, so the pose default loses nothing.
+SKIN_MAX_SIDE = int(os.environ.get("FASHION_SKIN_MAX_SIDE", "800"))
+POSE_MAX_SIDE = int(os.environ.get("FASHION_POSE_MAX_SIDE", "1333"))
+
+# Shrink so the longest side is at most max_side; returns (image, scale)
+def resize_to_max_side(img, max_side):
+    h, w = img.shape[:2]
+    longest = max(h, w)
+    if not max_side or longest <= max_side:
+        return img, 1.0
+    scale = max_side / longest
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA), scale
+
+# Map (N, 17, 3) keypoints from a resized image back to original pixel coordinates
+def rescale_keypoints(keypoints, scale):
+    if scale == 1.0:
+        return keypoints
+    keypoints = np.array(keypoints, dtype=np.float32, copy=True)
+    keypoints[..., :2] /= scale
+    return keypoints
+
+def skin_input(original, max_side=SKIN_MAX_SIDE):
+    return resize_to_max_side(original, max_side)[0]
+
+def pose_input(original, max_side=POSE_MAX_SIDE):
+    return resize_to_max_side(original, max_side)
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fashion import metrics
+
+# Analysis results keyed by the SHA-256 of the uploaded image bytes.
+# Values must be JSON-serialisable; they are stored serialised so callers
+# always get their own copy and sizes are known for eviction.
+
+MEMORY_MAX_BYTES = int(os.environ.get("FASHION_RESULT_CACHE_BYTES", str(32 * 1024 * 1024)))
+DISK_DIR = os.environ.get("FASHION_RESULT_CACHE_DIR")
+DISK_MAX_BYTES = int(os.environ.get("FASHION_RESULT_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+
+def image_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_bytes=MEMORY_MAX_BYTES, disk_dir=DISK_DIR, disk_max_bytes=DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            self._scan_disk()
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _scan_disk(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    st = os.stat(os.path.join(root, name))
+                    entries.append((st.st_mtime, name[:-5], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _remember(self, key, blob):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        if len(blob) > self.max_bytes:
+            return
+        self._memory[key] = blob
+        self._memory_bytes += len(blob)
+        while self._memory_bytes > self.max_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+            self.evictions += 1
+
+    def _read_disk(self, key):
+        if key not in self._disk:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                blob = f.read()
+        except OSError:
+            self._disk_bytes -= self._disk.pop(key)
+            return None
+        self._disk.move_to_end(key)
+        return blob
+
+    def _write_disk(self, key, blob):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+        self._disk[key] = len(blob)
+        self._disk_bytes += len(blob)
+        while self._disk_bytes > self.disk_max_bytes and len(self._disk) > 1:
+            old, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def get(self, key):
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            elif self.disk_dir and (blob := self._read_disk(key)) is not None:
+                self._remember(key, blob)
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                return None
+        return json.loads(blob)
+
+    def put(self, key, value):
+        blob = json.dumps(value).encode("utf-8")
+        with self._lock:
+            self._remember(key, blob)
+            if self.disk_dir:
+                self._write_disk(key, blob)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+                metrics.register_collector("result_cache", _cache.stats, {
+                    "memory_entries": ("memory_entries", "gauge", "Results held in memory."),
+                    "memory_bytes": ("memory_bytes", "gauge", "Serialised size of the results in memory."),
+                    "disk_entries": ("disk_entries", "gauge", "Results stored on disk."),
+                    "disk_bytes": ("disk_bytes", "gauge", "Size of the results on disk."),
+                    "memory_hits": ("memory_hits_total", "counter", "Lookups answered from memory."),
+                    "disk_hits": ("disk_hits_total", "counter", "Lookups answered from disk."),
+                    "misses": ("misses_total", "counter", "Lookups with no stored result."),
+                    "evictions": ("evictions_total", "counter", "Results evicted to stay under the size limits."),
+                })
+    return _cache
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+
+from fashion.body import LEFT_SHOULDER, RIGHT_SHOULDER, MIN_KEYPOINT_SCORE, primary_subject
+
+# Regions of interest for the skin-tone path, taken from pose keypoints (COCO-17
+# order, original image coordinates). FASHION_SKIN_ROI chooses how far to narrow:
+#   regions  crop to the person, and only count skin inside the face and forearm boxes (default)
+#   person   crop to the person's bounding box
+#   off      whole frame, as before
+
+SKIN_ROI = os.environ.get("FASHION_SKIN_ROI", "regions")
+PERSON_MARGIN = 0.10
+FACE = (0, 1, 2, 3, 4)
+FOREARMS = ((7, 9), (8, 10))  # (elbow, wrist) per side
+
+# Same visibility rule as the body measurements
+def _visible(kp):
+    return kp[:, 2] >= MIN_KEYPOINT_SCORE
+
+def _clip_box(x0, y0, x1, y1, shape):
+    h, w = shape[:2]
+    x0, y0 = max(0, int(x0)), max(0, int(y0))
+    x1, y1 = min(w, int(np.ceil(x1))), min(h, int(np.ceil(y1)))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return x0, y0, x1, y1
+
+# Bounding box of the visible keypoints, padded so hands/hair at the edges stay in
+def person_box(kp, shape, margin=PERSON_MARGIN):
+    points = kp[_visible(kp), :2]
+    if len(points) < 2:
+        return None
+    (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+    pad_x, pad_y = (x1 - x0) * margin, (y1 - y0) * margin
+    # Keypoints stop at the eyes/ears, so leave extra room above for the forehead
+    return _clip_box(x0 - pad_x, y0 - pad_y - (x1 - x0) * 0.25, x1 + pad_x, y1 + pad_y, shape)
+
+def face_box(kp, shape):
+    visible = _visible(kp)
+    face = kp[list(FACE)][visible[list(FACE)], :2]
+    if len(face) == 0:
+        return None
+    cx, cy = face.mean(axis=0)
+    size = np.ptp(face[:, 0]) if len(face) > 1 else 0
+    if visible[LEFT_SHOULDER] and visible[RIGHT_SHOULDER]:
+        size = max(size, 0.35 * abs(kp[LEFT_SHOULDER, 0] - kp[RIGHT_SHOULDER, 0]))
+    if size < 4:
+        return None
+    return _clip_box(cx - 0.7 * size, cy - 0.9 * size, cx + 0.7 * size, cy + 1.0 * size, shape)
+
+def forearm_boxes(kp, shape):
+    visible = _visible(kp)
+    boxes = []
+    for elbow, wrist in FOREARMS:
+        if not (visible[elbow] and visible[wrist]):
+            continue
+        (ex, ey), (wx, wy) = kp[elbow, :2], kp[wrist, :2]
+        pad = 0.2 * np.hypot(wx - ex, wy - ey)
+        box = _clip_box(min(ex, wx) - pad, min(ey, wy) - pad, max(ex, wx) + pad, max(ey, wy) + pad, shape)
+        if box:
+            boxes.append(box)
+    return boxes
+
+# Crop of `image` to analyze and an optional 0/255 mask of where skin may be counted
+# inside that crop; (image, None) when there is no usable person. The person is the
+# one the body measurements use, or the top detection if nobody is measurable.
+def skin_roi(image, keypoints, mode=SKIN_ROI):
+    if mode == "off" or keypoints is None or len(keypoints) == 0:
+        return image, None
+    index = primary_subject(keypoints)
+    kp = np.asarray(keypoints[0 if index is None else index], dtype=np.float32)
+    box = person_box(kp, image.shape)
+    if box is None:
+        return image, None
+    x0, y0, x1, y1 = box
+    crop = image[y0:y1, x0:x1]
+    if mode == "person":
+        return crop, None
+
+    regions = [b for b in [face_box(kp, image.shape)] + forearm_boxes(kp, image.shape) if b]
+    if not regions:
+        return crop, None
+    mask = np.zeros(crop.shape[:2], dtype=np.uint8)
+    for rx0, ry0, rx1, ry1 in regions:
+        mask[max(0, ry0 - y0):max(0, ry1 - y0), max(0, rx0 - x0):max(0, rx1 - x0)] = 255
+    return crop, mask
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from fashion.metrics import span
+from fashion.outfits import fetch_outfit_images
+
+# Outfit inspiration per (season, body shape). There are only 16 combinations,
+# so search results and their thumbnails are kept on disk with a TTL and the
+# page renders them without touching the network. Warm every combination with:
+#   python -m fashion.search_cache --warm
+# FASHION_SEARCH_PROVIDER picks the search backend: "duckduckgo" (default) or
+# "fixture:<path to JSON mapping query -> [image urls]>".
+
+SEASONS = ("Spring", "Summer", "Autumn", "Winter")
+BODY_SHAPES = ("hourglass", "inverted triangle", "pear", "rectangle")
+MAX_RESULTS = 3
+
+CACHE_DIR = os.environ.get("FASHION_OUTFIT_CACHE_DIR", os.path.join("cache", "outfits"))
+TTL_SECONDS = int(os.environ.get("FASHION_OUTFIT_CACHE_TTL", str(7 * 24 * 3600)))
+
+def outfit_query(season, shape):
+    return f"{season} {shape} outfit"
+
+
+class DuckDuckGoProvider:
+    # Import the search client ahead of the first query
+    def preload(self):
+        import duckduckgo_search  # noqa: F401
+
+    def search(self, query, max_results=MAX_RESULTS):
+        from duckduckgo_search import DDGS
+        with DDGS() as ddgs:
+            results = list(ddgs.images(query, max_results=max_results))
+        return [result['image'] for result in results[:max_results]]
+
+
+# Canned results from a JSON file, for tests and offline development
+class FixtureProvider:
+    def __init__(self, path):
+        with open(path) as f:
+            self.results = json.load(f)
+
+    def preload(self):
+        pass
+
+    def search(self, query, max_results=MAX_RESULTS):
+        return list(self.results.get(query, []))[:max_results]
+
+def provider_from_env():
+    spec = os.environ.get("FASHION_SEARCH_PROVIDER", "duckduckgo")
+    if spec == "duckduckgo":
+        return DuckDuckGoProvider()
+    if spec.startswith("fixture:"):
+        return FixtureProvider(spec[len("fixture:"):])
+    raise ValueError(f"Unknown search provider: {spec}")
+
+
+class OutfitSearchCache:
+    def __init__(self, provider=None, directory=CACHE_DIR, ttl=TTL_SECONDS):
+        self.provider = provider or provider_from_env()
+        self.directory = directory
+        self.ttl = ttl
+        self._memory = {}
+        self._inflight = {}  # (season, shape) -> Future of the refresh running for it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_dir(self, season, shape):
+        return os.path.join(self.directory, re.sub(r"\W+", "_", f"{season}_{shape}".lower()))
+
+    def _fresh(self, entry):
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl
+
+    def _load(self, season, shape):
+        entry_dir = self._entry_dir(season, shape)
+        try:
+            with open(os.path.join(entry_dir, "index.json")) as f:
+                index = json.load(f)
+            thumbnails = []
+            for name in index["thumbnails"]:
+                with open(os.path.join(entry_dir, name), "rb") as f:
+                    thumbnails.append(f.read())
+        except (OSError, ValueError, KeyError):
+            return None
+        return {"fetched_at": index["fetched_at"], "urls": index["urls"], "thumbnails": thumbnails}
+
+    def _save(self, season, shape, entry):
+        entry_dir = self._entry_dir(season, shape)
+        os.makedirs(entry_dir, exist_ok=True)
+        names = []
+        for i, thumbnail in enumerate(entry["thumbnails"]):
+            name = f"{i}.jpg"
+            with open(os.path.join(entry_dir, name), "wb") as f:
+                f.write(thumbnail)
+            names.append(name)
+        tmp = os.path.join(entry_dir, "index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": entry["fetched_at"], "urls": entry["urls"], "thumbnails": names}, f)
+        os.replace(tmp, os.path.join(entry_dir, "index.json"))
+
+    # Search and download thumbnails now, replacing whatever is stored
+    def refresh(self, season, shape):
+        with span("search.query"):
+            urls = self.provider.search(outfit_query(season, shape), MAX_RESULTS)
+        with span("search.images"):
+            thumbnails = [t for t in fetch_outfit_images(urls) if t]
+        entry = {"fetched_at": time.time(), "urls": urls, "thumbnails": thumbnails}
+        # Only keep usable results so a network blip is retried next time
+        if thumbnails or not urls:
+            self._save(season, shape, entry)
+            with self._lock:
+                self._memory[(season, shape)] = entry
+        return entry
+
+    # Thumbnail JPEG bytes for (season, shape), from memory or disk when fresh
+    def get(self, season, shape):
+        key = (season, shape)
+        with self._lock:
+            entry = self._memory.get(key)
+        if not self._fresh(entry):
+            entry = self._load(season, shape)
+            if self._fresh(entry):
+                with self._lock:
+                    self._memory[key] = entry
+        if self._fresh(entry):
+            with self._lock:
+                self.hits += 1
+            return entry["thumbnails"]
+        with self._lock:
+            self.misses += 1
+        return self._refresh_once(season, shape)["thumbnails"]
+
+    # refresh(), but concurrent misses on the same key wait for one search instead of each running their own
+    def _refresh_once(self, season, shape):
+        key = (season, shape)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            entry = self.refresh(season, shape)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(entry)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return entry
+
+    def warm(self, force=False):
+        for season in SEASONS:
+            for shape in BODY_SHAPES:
+                if not force and self._fresh(self._load(season, shape)):
+                    yield season, shape, "fresh"
+                    continue
+                try:
+                    entry = self.refresh(season, shape)
+                    yield season, shape, f"{len(entry['thumbnails'])} thumbnails"
+                except Exception as e:
+                    yield season, shape, f"failed: {e}"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_outfit_search_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OutfitSearchCache()
+    return _cache
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch outfit inspiration for every season/shape.")
+    parser.add_argument("--warm", action="store_true", help="fetch all missing or stale combinations")
+    parser.add_argument("--force", action="store_true", help="refetch even fresh combinations")
+    parser.add_argument("--dir", default=CACHE_DIR)
+    args = parser.parse_args()
+    if not (args.warm or args.force):
+        parser.error("nothing to do; pass --warm")
+
+    cache = OutfitSearchCache(directory=args.dir)
+    for season, shape, status in cache.warm(force=args.force):
+        print(f"{season:<7} {shape:<18} {status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import logging
+
+from fashion import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bounded, deduplicated storage for uploaded photos. Files are named by the
+# SHA-256 of their bytes, so a re-upload of the same photo is stored once, and
+# sharded two levels deep (img/ab/cd/abcd....jpg) to keep directories small.
+# Compaction drops files unused for FASHION_STORAGE_MAX_AGE_DAYS and then the
+# least recently used ones until the store is under FASHION_STORAGE_QUOTA_MB.
+# FASHION_STORAGE picks the backend: "local:<dir>" (default local:img) or
+# "s3://bucket/prefix" for S3 or an S3-compatible stand-in such as MinIO
+# (FASHION_STORAGE_ENDPOINT). Compact by hand with:
+#   python -m fashion.storage compact [--include-legacy]
+
+STORAGE = os.environ.get("FASHION_STORAGE", "local:img")
+STORAGE_ENDPOINT = os.environ.get("FASHION_STORAGE_ENDPOINT")
+QUOTA_BYTES = int(float(os.environ.get("FASHION_STORAGE_QUOTA_MB", "2048")) * 1024 * 1024)
+MAX_AGE_SECONDS = float(os.environ.get("FASHION_STORAGE_MAX_AGE_DAYS", "30")) * 86400
+COMPACT_INTERVAL = float(os.environ.get("FASHION_STORAGE_COMPACT_INTERVAL", "600"))
+# Evict down to this fraction of the quota so compaction doesn't run on every upload
+LOW_WATERMARK = 0.9
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$")
+# Files saved flat in the directory by the upload page before sharding (uuid4 names)
+LEGACY_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.\w+$")
+
+def content_key(data, extension):
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+# Files under a local directory; "last used" is the file's mtime, bumped on reuse
+class LocalBackend:
+    def __init__(self, root):
+        self.root = root
+
+    def location(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key):
+        return os.path.exists(self.location(key))
+
+    def put(self, key, data):
+        path = self.location(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, key):
+        try:
+            with open(self.location(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def touch(self, key):
+        try:
+            os.utime(self.location(key))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key):
+        path = self.location(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        # Drop shard directories left empty
+        for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+
+    # (key, size, last used) for every stored object
+    def list(self):
+        if not os.path.isdir(self.root):
+            return
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield key, st.st_size, st.st_mtime
+
+
+# An S3 bucket or any S3-compatible service; "last used" is LastModified,
+# bumped on reuse by copying the object onto itself
+class S3Backend:
+    def __init__(self, bucket, prefix="", endpoint_url=STORAGE_ENDPOINT):
+        import boto3  # optional dependency, only for this backend
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def location(self, key):
+        return f"s3://{self.bucket}/{self.prefix}{key}"
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except ClientError:
+            return False
+
+    def put(self, key, data):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def get(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except ClientError:
+            return None
+
+    def touch(self, key):
+        self.client.copy_object(Bucket=self.bucket, Key=self.prefix + key, MetadataDirective="REPLACE",
+                                CopySource={"Bucket": self.bucket, "Key": self.prefix + key})
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def list(self):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix):], obj["Size"], obj["LastModified"].timestamp()
+
+def backend_from_env(spec=STORAGE):
+    if spec.startswith("local:"):
+        return LocalBackend(spec[len("local:"):])
+    if spec.startswith("s3://"):
+        bucket, _, prefix = spec[len("s3://"):].partition("/")
+        return S3Backend(bucket, prefix)
+    raise ValueError(f"Unknown storage backend: {spec}")
+
+
+class UploadStore:
+    def __init__(self, backend=None, quota_bytes=QUOTA_BYTES, max_age_seconds=MAX_AGE_SECONDS):
+        self.backend = backend or backend_from_env()
+        self.quota_bytes = quota_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self.saves = 0
+        self.dedup_hits = 0
+        self.bytes_written = 0
+        self.last_compaction = None
+
+    # Store the photo (once per distinct content) and return where it lives
+    def save(self, data, extension):
+        key = content_key(data, extension)
+        if self.backend.exists(key):
+            self.backend.touch(key)
+            with self._lock:
+                self.saves += 1
+                self.dedup_hits += 1
+        else:
+            self.backend.put(key, data)
+            with self._lock:
+                self.saves += 1
+                self.bytes_written += len(data)
+        return self.backend.location(key)
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    # Evict expired files, then least recently used ones until under the quota.
+    # Only sharded keys are considered, plus flat uuid-named uploads with include_legacy.
+    def compact(self, include_legacy=False, now=None):
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        entries = [(last_used, key, size) for key, size, last_used in self.backend.list()
+                   if KEY_PATTERN.match(key) or (include_legacy and LEGACY_PATTERN.match(key))]
+        total = sum(size for _, _, size in entries)
+        report = {"files": len(entries), "bytes": total, "expired": 0, "over_quota": 0, "bytes_reclaimed": 0}
+
+        entries.sort()  # least recently used first
+        target = self.quota_bytes * LOW_WATERMARK if total > self.quota_bytes else total
+        for last_used, key, size in entries:
+            expired = now - last_used > self.max_age_seconds
+            if not expired and total <= target:
+                break
+            self.backend.delete(key)
+            total -= size
+            report["bytes_reclaimed"] += size
+            report["expired" if expired else "over_quota"] += 1
+        report["bytes_after"] = total
+        report["seconds"] = time.perf_counter() - start
+        with self._lock:
+            self.last_compaction = report
+        return report
+
+    def stats(self):
+        with self._lock:
+            return {"saves": self.saves, "dedup_hits": self.dedup_hits, "bytes_written": self.bytes_written,
+                    "quota_bytes": self.quota_bytes, "last_compaction": self.last_compaction}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_upload_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = UploadStore()
+                metrics.register_collector("upload_store", _store.stats, {
+                    "saves": ("saves_total", "counter", "Uploads saved, duplicates included."),
+                    "dedup_hits": ("dedup_hits_total", "counter", "Uploads already in the store."),
+                    "bytes_written": ("written_bytes_total", "counter", "Bytes written for new uploads."),
+                    "quota_bytes": ("quota_bytes", "gauge", "Size limit that triggers compaction."),
+                })
+    return _store
+
+_compaction_started = False
+
+def _compact_loop(interval):
+    while True:
+        try:
+            report = get_upload_store().compact()
+            if report["bytes_reclaimed"]:
+                logger.info("Upload store compaction reclaimed %.1f MB (%d expired, %d over quota), %.1f MB left",
+                            report["bytes_reclaimed"] / 2**20, report["expired"], report["over_quota"],
+                            report["bytes_after"] / 2**20)
+        except Exception:
+            logger.exception("Upload store compaction failed")
+        time.sleep(interval)
+
+# Compact the upload store every `interval` seconds in a daemon thread, once per process
+def start_background_compaction(interval=COMPACT_INTERVAL):
+    global _compaction_started
+    if interval <= 0:
+        return False
+    with _store_lock:
+        if _compaction_started:
+            return False
+        _compaction_started = True
+    threading.Thread(target=_compact_loop, args=(interval,), name="upload-store-compaction", daemon=True).start()
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the uploaded photo store.")
+    parser.add_argument("command", choices=("compact", "stats"))
+    parser.add_argument("--include-legacy", action="store_true",
+                        help="also age out flat uuid-named uploads saved before sharding")
+    args = parser.parse_args()
+
+    store = get_upload_store()
+    if args.command == "compact":
+        print(json.dumps(store.compact(include_legacy=args.include_legacy), indent=2))
+    else:
+        entries = [(key, size) for key, size, _ in store.backend.list() if KEY_PATTERN.match(key)]
+        print(json.dumps({"files": len(entries), "bytes": sum(size for _, size in entries),
+                          "quota_bytes": store.quota_bytes}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import threading
+
+import numpy as np
+import cv2
+
+# Reference skin tones and their season, as one precomputed index.
+# find_nearest_skin_color() does an exact vectorized nearest lookup, which is what
+# the app and fashion.batch use (one colour per photo). classify_colors() goes
+# through a quantized 3-D LUT for classifying many colours at once (thousands per
+# ms; see benchmarks/bench_tone_lookup.py).
+# FASHION_TONE_SPACE=lab measures distance as CIEDE2000 instead of Euclidean RGB.
+# Lookups take colours in RGB order; pass order="bgr" for OpenCV colours, in either space.
+
+SKIN_TONES = {
+    "#ead8c4": "Spring", "#e0c8ae": "Spring",
+    "#d2b897": "Summer", "#c4a682": "Summer",
+    "#b4976f": "Autumn", "#a5855e": "Autumn", "#a7835f": "Autumn",
+    "#80643d": "Winter", "#6d5533": "Winter", "#594427": "Winter", "#453420": "Winter"
+}
+SEASONS = ("Spring", "Summer", "Autumn", "Winter")
+TONE_SPACE = os.environ.get("FASHION_TONE_SPACE", "rgb")
+LUT_BITS = 6
+
+TONE_HEX = tuple(SKIN_TONES)
+TONE_SEASON = np.array([SEASONS.index(SKIN_TONES[h]) for h in TONE_HEX], dtype=np.uint8)
+PALETTE = np.array([[int(h[i:i + 2], 16) for i in (1, 3, 5)] for h in TONE_HEX], dtype=np.float32)
+
+# sRGB-ordered (N, 3) values in 0..255 to CIELAB with L in 0..100
+def to_lab(colors):
+    colors = np.asarray(colors, dtype=np.float32).reshape(-1, 1, 3) / 255.0
+    return cv2.cvtColor(colors, cv2.COLOR_RGB2LAB).reshape(-1, 3)
+
+PALETTE_LAB = to_lab(PALETTE)
+
+# CIEDE2000 between every row of lab1 (N, 3) and every row of lab2 (M, 3) -> (N, M)
+def delta_e2000(lab1, lab2):
+    L1, a1, b1 = [c[:, None] for c in lab1.T.astype(np.float64)]
+    L2, a2, b2 = [c[None, :] for c in lab2.T.astype(np.float64)]
+    c_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_bar ** 7 / (c_bar ** 7 + 25.0 ** 7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dL = L2 - L1
+    dC = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0, dh)
+    dH = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh) / 2)
+
+    L_bar = (L1 + L2) / 2
+    c_bar_p = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    h_bar = np.where(np.abs(h1p - h2p) > 180, np.where(h_sum < 360, h_sum + 360, h_sum - 360), h_sum) / 2
+    h_bar = np.where(c1p * c2p == 0, h_sum, h_bar)
+    t = (1 - 0.17 * np.cos(np.radians(h_bar - 30)) + 0.24 * np.cos(np.radians(2 * h_bar))
+         + 0.32 * np.cos(np.radians(3 * h_bar + 6)) - 0.20 * np.cos(np.radians(4 * h_bar - 63)))
+    s_l = 1 + 0.015 * (L_bar - 50) ** 2 / np.sqrt(20 + (L_bar - 50) ** 2)
+    s_c = 1 + 0.045 * c_bar_p
+    s_h = 1 + 0.015 * c_bar_p * t
+    r_t = (-2 * np.sqrt(c_bar_p ** 7 / (c_bar_p ** 7 + 25.0 ** 7))
+           * np.sin(np.radians(60 * np.exp(-(((h_bar - 275) / 25) ** 2)))))
+    return np.sqrt((dL / s_l) ** 2 + (dC / s_c) ** 2 + (dH / s_h) ** 2
+                   + r_t * (dC / s_c) * (dH / s_h))
+
+# Index into TONE_HEX of the nearest reference tone for each of the (N, 3) colours
+def nearest_tone_index(colors, space=TONE_SPACE, order="rgb"):
+    colors = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+    if order == "bgr":
+        colors = colors[:, ::-1]
+    elif order != "rgb":
+        raise ValueError(f"Unknown channel order: {order}")
+    if space == "lab":
+        return np.argmin(delta_e2000(to_lab(colors), PALETTE_LAB), axis=1)
+    if space != "rgb":
+        raise ValueError(f"Unknown tone space: {space}")
+    dist = ((colors[:, None, :] - PALETTE[None, :, :]) ** 2).sum(axis=2)
+    return np.argmin(dist, axis=1)
+
+# (nearest tone hex, season) for one colour
+def find_nearest_skin_color(detected_color, space=TONE_SPACE, order="rgb"):
+    index = int(nearest_tone_index(detected_color, space, order)[0])
+    return TONE_HEX[index], SKIN_TONES[TONE_HEX[index]]
+
+def nearest_skin_color(detected_color, space=TONE_SPACE, order="rgb"):
+    return find_nearest_skin_color(detected_color, space, order)[0]
+
+
+_luts = {}
+_lut_lock = threading.Lock()
+
+# Tone index for every quantized colour, evaluated at each bin's centre
+def tone_lut(space=TONE_SPACE, bits=LUT_BITS, order="rgb"):
+    key = (space, bits, order)
+    if key not in _luts:
+        with _lut_lock:
+            if key not in _luts:
+                levels = (np.arange(1 << bits, dtype=np.float32) + 0.5) * (1 << (8 - bits))
+                grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1).reshape(-1, 3)
+                lut = np.concatenate([nearest_tone_index(chunk, space, order) for chunk in np.array_split(grid, 64)])
+                _luts[key] = lut.astype(np.uint8).reshape((1 << bits,) * 3)
+    return _luts[key]
+
+# Bulk (tone index, season index) for (N, 3) uint8 colours via the LUT; O(1) per colour
+def classify_colors(colors, space=TONE_SPACE, bits=LUT_BITS, order="rgb"):
+    q = np.asarray(colors, dtype=np.uint8).reshape(-1, 3) >> (8 - bits)
+    tones = tone_lut(space, bits, order)[q[:, 0], q[:, 1], q[:, 2]]
+    return tones, TONE_SEASON[tones]
@@ -0,0 +1,28 @@
+import os
+import threading
+
+# Torch CPU thread settings for inference, applied once per process before the
+# first model is built. Unset variables leave torch's defaults alone.
+#   FASHION_TORCH_THREADS          intra-op threads (torch.set_num_threads)
+#   FASHION_TORCH_INTEROP_THREADS  inter-op threads (torch.set_num_interop_threads)
+
+INTRA_OP_THREADS = os.environ.get("FASHION_TORCH_THREADS")
+INTER_OP_THREADS = os.environ.get("FASHION_TORCH_INTEROP_THREADS")
+
+_configured = False
+_lock = threading.Lock()
+
+def configure_torch_threads(intra_op=INTRA_OP_THREADS, inter_op=INTER_OP_THREADS):
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+        import torch
+        if intra_op:
+            torch.set_num_threads(int(intra_op))
+        if inter_op:
+            try:
+                torch.set_num_interop_threads(int(inter_op))
+            except RuntimeError:
+                pass  # inter-op pool already started; only settable before first use